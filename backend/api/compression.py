@@ -0,0 +1,252 @@
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional, `pip install brotli`
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, `pip install zstandard`
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Server preference, used to break ties between equally weighted client encodings
+PREFERRED_ENCODINGS = ("zstd", "br", "gzip")
+UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream", "image/", "audio/", "video/", "application/zip", "application/gzip")
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+@dataclass(frozen=True)
+class CompressionConfig:
+    """Compression settings for a group of routes.
+
+    Attributes:
+        enabled: Whether responses are compressed at all
+        minimum_size: Responses smaller than this many bytes are sent as is
+        gzip_level: zlib compression level, 1 (fast) to 9 (small)
+        brotli_level: Brotli quality, 0 (fast) to 11 (small)
+        zstd_level: Zstandard level, 1 (fast) to 22 (small)
+        encodings: Encodings offered, in server preference order
+    """
+    enabled: bool = True
+    minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_level: int = 4
+    zstd_level: int = 3
+    encodings: tuple[str, ...] = PREFERRED_ENCODINGS
+
+    def compressor(self, encoding: str) -> Compressor:
+        if encoding == "zstd":
+            return _ZstdCompressor(self.zstd_level)
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_level)
+        return _GzipCompressor(self.gzip_level)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings supported by the installed libraries, in server preference order."""
+    installed = {"zstd": zstandard is not None, "br": brotli is not None, "gzip": True}
+    return tuple(encoding for encoding in PREFERRED_ENCODINGS if installed[encoding])
+
+
+def negotiate_encoding(accept_encoding: str, offered: tuple[str, ...]) -> Optional[str]:
+    """Pick the encoding to use from an `Accept-Encoding` header.
+
+    The encoding with the highest q-value wins, ties are broken by the order of `offered`.
+    Encodings with `q=0` are refused, and `*` applies to encodings not listed explicitly.
+
+    Args:
+        accept_encoding: Value of the request `Accept-Encoding` header
+        offered: Encodings the server can produce, in preference order
+
+    Returns:
+        Optional[str]: The chosen encoding, or None to send the response uncompressed
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [token.strip() for token in part.split(";")]
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in offered:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding accepted by the client (zstd, brotli or gzip).
+
+    Brotli and Zstandard are only offered when their optional packages are installed.
+    Small responses, responses already encoded and media or event streams are sent as is.
+    Streaming responses are compressed chunk by chunk, without buffering the whole body.
+
+    Settings can be overridden per route by path prefix, the longest prefix winning:
+
+        app.add_middleware(
+            CompressionMiddleware,
+            overrides={"/api/documents/batch": CompressionConfig(minimum_size=256, zstd_level=6)},
+        )
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        config: Optional[CompressionConfig] = None,
+        overrides: Optional[dict[str, CompressionConfig]] = None,
+    ):
+        """Initialize the CompressionMiddleware.
+
+        Args:
+            app: The wrapped ASGI application
+            config: Settings applied to every route without an override
+            overrides: Settings by path prefix
+        """
+        self.app = app
+        self.config = config or CompressionConfig()
+        self.overrides = sorted((overrides or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.available = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # HEAD responses carry no body, whose compressed length would be wrong anyway
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        config = self._config_for(scope["path"])
+        encoding = None
+        if config.enabled:
+            offered = tuple(encoding for encoding in config.encodings if encoding in self.available)
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), offered)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressedResponder(send, encoding, config).send)
+
+    def _config_for(self, path: str) -> CompressionConfig:
+        for prefix, config in self.overrides:
+            if path.startswith(prefix):
+                return config
+        return self.config
+
+
+class _CompressedResponder:
+    """Wrap the ASGI `send` of one response, deciding on compression once the first body chunk is known."""
+
+    def __init__(self, send: Send, encoding: str, config: CompressionConfig):
+        self._send = send
+        self.encoding = encoding
+        self.config = config
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                "content-encoding" in headers
+                or content_type.startswith(UNCOMPRESSED_CONTENT_TYPES)
+                or message["status"] in (204, 304)
+            ):
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start_message["headers"])
+            declared_size = int(headers.get("content-length", -1))
+            size = declared_size if declared_size >= 0 else (len(body) if not more_body else self.config.minimum_size)
+            headers.add_vary_header("Accept-Encoding")
+            if size < self.config.minimum_size:
+                self.passthrough = True
+                await self._send(start_message)
+                await self._send(message)
+                return
+
+            self.compressor = self.config.compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(body))
+                await self._send(start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._send(start_message)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        elif not chunk:
+            return
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "<unmatched>"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(4 ** exponent for exponent in range(3, 13))
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests completed, by route template and status code.", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last response byte, by route template.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled, by route template.", ["method", "route"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size, by route template.", ["method", "route"], buckets=SIZE_BUCKETS
+)
+REQUEST_EXCEPTIONS = Counter(
+    "http_request_exceptions_total",
+    "Requests that raised an unhandled exception, by route template and exception type.",
+    ["method", "route", "exception"],
+)
+EVENT_LOOP_LAG = Gauge("event_loop_lag_seconds", "Delay of the last event loop lag probe past its scheduled wake-up.")
+
+
+async def monitor_event_loop_lag(interval: float = 1.0) -> None:
+    """Measure how late the event loop wakes up a sleeping task, forever.
+
+    A lag well above zero means something blocks the loop (CPU-bound work or sync I/O in
+    an async endpoint).
+
+    Args:
+        interval: Seconds between two probes
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - started - interval))
+
+
+async def metrics(request: Request) -> Response:
+    """Expose the default registry in the Prometheus text format.
+
+    Besides the HTTP metrics of `MetricsMiddleware`, the default registry includes the
+    process (RSS, CPU, open fds) and garbage collector collectors of `prometheus_client`.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Record per-route request counts, latencies, in-flight requests, response sizes and errors.
+
+    Requests are labelled with their route template (e.g. `/api/documents/{document_id}`)
+    rather than their raw path, to keep label cardinality bounded. Requests not matching
+    any route are grouped under `<unmatched>`. The event loop lag probe is started on the
+    first request.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple[str, ...] = ("/metrics",), lag_interval: float = 1.0):
+        """Initialize the MetricsMiddleware.
+
+        Args:
+            app: The wrapped ASGI application
+            exclude_paths: Paths not instrumented, typically the scrape endpoint itself
+            lag_interval: Seconds between two event loop lag probes
+        """
+        self.app = app
+        self.exclude_paths = exclude_paths
+        self.lag_interval = lag_interval
+        self._lag_task: Optional[asyncio.Task] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self._lag_task is None or self._lag_task.done():
+            self._lag_task = asyncio.create_task(monitor_event_loop_lag(self.lag_interval))
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            REQUEST_EXCEPTIONS.labels(method, route, type(e).__name__).inc()
+            raise
+        finally:
+            in_flight.dec()
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            RESPONSE_SIZE.labels(method, route).observe(response_size)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+
+    @staticmethod
+    def _route_template(scope: Scope) -> str:
+        app = scope.get("app")
+        partial = None
+        for route in getattr(app, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path
+        return partial or UNMATCHED_ROUTE
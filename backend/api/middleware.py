@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Optional
+
+import jwt
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend import PROJECT_ENVS
+from backend.utils.auth import decode_token
+from backend.workers.events import get_client
+from backend.workers.scheduler import PENDING_KEY
+
+logger = logging.getLogger(__name__)
+
+CELERY_QUEUE = "celery"
+
+
+class QueueDepthProbe:
+    """Jobs waiting in the Celery broker queue and in the scheduler, refreshed at most once per `interval` seconds.
+
+    Probe failures are logged and reported as an empty queue, so a broker outage never
+    blocks the API on its own.
+    """
+
+    def __init__(self, queue: str = CELERY_QUEUE, interval: float = 1.0):
+        self.queue = queue
+        self.interval = interval
+        self._depth = 0
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def __call__(self) -> int:
+        if time.monotonic() - self._checked_at < self.interval:
+            return self._depth
+        async with self._lock:
+            if time.monotonic() - self._checked_at >= self.interval:
+                try:
+                    self._depth = await asyncio.to_thread(self._read_depth)
+                except Exception as e:
+                    logger.warning(f"Could not read depth of queue '{self.queue}': {e}")
+                    self._depth = 0
+                self._checked_at = time.monotonic()
+        return self._depth
+
+    def _read_depth(self) -> int:
+        pipeline = get_client().pipeline()
+        pipeline.llen(self.queue)
+        pipeline.get(PENDING_KEY)
+        broker_depth, pending = pipeline.execute()
+        return broker_depth + int(pending or 0)
+
+
+class AdmissionControlMiddleware:
+    """Bound the work admitted to the API and shed the rest with 429/503 and Retry-After.
+
+    Only requests under `path_prefixes` are governed. Requests are rejected when:
+
+    - the caller already has `max_in_flight_per_user` requests in flight (429)
+    - the API already has `max_in_flight` governed requests in flight (503)
+    - the request submits new work (POST) while `max_queue_depth` jobs are already waiting (503)
+
+    Callers are identified by the `sub` claim of their bearer token, or by client address
+    when the token is missing or invalid. Long-lived streams (`exempt_suffixes`) and CORS
+    preflight requests are not counted, as they hold a connection without doing work.
+
+    Counters live in the process: with several API workers, each admits up to its own
+    limits, so size them per worker.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefixes: tuple[str, ...] = ("/api/documents",),
+        exempt_suffixes: tuple[str, ...] = ("/events",),
+        max_in_flight: int = PROJECT_ENVS.ADMISSION_MAX_IN_FLIGHT,
+        max_in_flight_per_user: int = PROJECT_ENVS.ADMISSION_MAX_IN_FLIGHT_PER_USER,
+        max_queue_depth: int = PROJECT_ENVS.ADMISSION_MAX_QUEUE_DEPTH,
+        retry_after_seconds: int = PROJECT_ENVS.ADMISSION_RETRY_AFTER_SECONDS,
+        queue_depth: Optional[Callable[[], Awaitable[int]]] = None,
+    ):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.exempt_suffixes = exempt_suffixes
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_user = max_in_flight_per_user
+        self.max_queue_depth = max_queue_depth
+        self.retry_after_seconds = retry_after_seconds
+        self.queue_depth = queue_depth or QueueDepthProbe()
+        self.in_flight = 0
+        self.in_flight_per_user: defaultdict[str, int] = defaultdict(int)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not path.startswith(self.path_prefixes)
+            or path.endswith(self.exempt_suffixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        user = self._caller(scope)
+        rejection = None
+        if self.in_flight_per_user[user] >= self.max_in_flight_per_user:
+            rejection = (429, "Too many concurrent requests for this user")
+        elif self.in_flight >= self.max_in_flight:
+            rejection = (503, "Server is at capacity")
+        elif scope["method"] == "POST" and await self.queue_depth() >= self.max_queue_depth:
+            rejection = (503, "Processing queue is full")
+
+        if rejection is not None:
+            if not self.in_flight_per_user[user]:
+                del self.in_flight_per_user[user]
+            status_code, detail = rejection
+            logger.info(f"Shed {scope['method']} {path} for {user}: {detail}")
+            response = JSONResponse(
+                {"detail": detail},
+                status_code=status_code,
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        self.in_flight_per_user[user] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self.in_flight_per_user[user] -= 1
+            if not self.in_flight_per_user[user]:
+                del self.in_flight_per_user[user]
+
+    @staticmethod
+    def _caller(scope: Scope) -> str:
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        return f"user:{decode_token(token).get('sub')}"
+                    except jwt.PyJWTError:
+                        pass
+                break
+        client = scope.get("client")
+        return f"address:{client[0] if client else 'unknown'}"
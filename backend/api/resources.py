@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:
+    import redis
+    from agents import Agent
+    from openai import AsyncOpenAI
+
+    from backend.db.db import FastAPISessionMaker
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class AppResources:
+    """Long-lived resources shared by every request, owned by the application lifespan.
+
+    Attributes:
+        session_maker: Database engine and sessionmaker
+        redis: Synchronous Redis client used for progress events and queue probes
+        openai_client: Client for the OpenAI API
+        anthropic_client: OpenAI-compatible client for the Anthropic API
+        agents: Agents by name, e.g. "documentation.claude" or "tester.openai", reached by
+            routes through `get_resources(request).agents`
+    """
+    session_maker: FastAPISessionMaker
+    redis: redis.Redis
+    openai_client: AsyncOpenAI
+    anthropic_client: AsyncOpenAI
+    agents: dict[str, Agent] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls) -> AppResources:
+        """Create the resources. Nothing is connected until `warm_up`."""
+        from backend.core.agents.documentarian import build_documentation_agents
+        from backend.core.agents.tester import build_tester_agents
+        from backend.core.clients import build_anthropic_client, build_openai_client
+        from backend.db import session_maker
+        from backend.workers.events import get_client
+
+        openai_client = build_openai_client()
+        anthropic_client = build_anthropic_client()
+        agents = {
+            f"{kind}.{provider}": agent
+            for kind, builder in (("documentation", build_documentation_agents), ("tester", build_tester_agents))
+            for provider, agent in builder(openai_client, anthropic_client).items()
+        }
+        return cls(
+            session_maker=session_maker,
+            redis=get_client(),
+            openai_client=openai_client,
+            anthropic_client=anthropic_client,
+            agents=agents,
+        )
+
+    async def warm_up(self, timeout: float = WARMUP_TIMEOUT_SECONDS) -> None:
+        """Fill the database pool and open the Redis and model API connections, concurrently.
+
+        Failures are logged rather than raised: an unreachable dependency must not prevent
+        the API from starting, it will only cost the first request a cold connection.
+
+        Args:
+            timeout: Maximum number of seconds spent warming each resource
+        """
+        from backend.core.clients import warm_client
+
+        started = time.monotonic()
+        results = await asyncio.gather(
+            asyncio.wait_for(asyncio.to_thread(self._warm_db_pool), timeout),
+            asyncio.wait_for(asyncio.to_thread(self.redis.ping), timeout),
+            warm_client(self.openai_client, timeout),
+            warm_client(self.anthropic_client, timeout),
+            return_exceptions=True,
+        )
+        for name, result in zip(("database", "redis", "openai", "anthropic"), results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Could not warm up {name}: {result!r}")
+        logger.info(f"Warmed up application resources in {time.monotonic() - started:.2f}s")
+
+    async def close(self) -> None:
+        """Release every connection, at shutdown."""
+        from backend.workers.events import close_client
+
+        for client in (self.openai_client, self.anthropic_client):
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Could not close client for {client.base_url}: {e}")
+        close_client()
+        self.session_maker.dispose()
+
+    def _warm_db_pool(self) -> None:
+        """Check out as many connections as the pool keeps, so none is opened on a request path."""
+        engine = self.session_maker.cached_engine
+        connections = []
+        try:
+            for _ in range(engine.pool.size()):
+                connection = engine.connect()
+                connections.append(connection)
+                connection.exec_driver_sql("SELECT 1")
+        finally:
+            for connection in connections:
+                connection.close()
+
+
+def get_resources(request: Request) -> AppResources:
+    """FastAPI dependency returning the resources built by the application lifespan."""
+    try:
+        return request.app.state.resources
+    except AttributeError:
+        raise RuntimeError("Application resources are not initialized, is the app running with its lifespan?")
+
+
+def get_db(request: Request) -> Iterator[Session]:
+    """FastAPI dependency yielding a session from the shared database pool."""
+    yield from get_resources(request).session_maker.get_db()
+
@@ -1,43 +1,505 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from schemas.document import DocumentRequest, DocumentResponse
-from core.processor import process_document
-from utils.auth import get_current_user
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncIterator, List, Optional
+from uuid import uuid4
 
-router = APIRouter(tags=["documents"])
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
 
-@router.post("/documents", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
-async def create_document(
+from backend import PROJECT_ENVS, PROJECT_PATHS
+from backend.constants import DocumentStatus
+from backend.api.resources import get_db
+from backend.repository.document import DocumentRepository
+from backend.schemas.document import (
+    DOCUMENT_LIST_DEFAULT_FIELDS,
+    DOCUMENT_LIST_FIELDS,
+    DocumentBatchItem,
+    DocumentBatchResponse,
+    DocumentPage,
+    DocumentRecord,
+    DocumentRequest,
+    DocumentResponse,
+    DocumentSearchResponse,
+    ProcessingOptions,
+)
+from backend.utils.auth import User, get_current_user
+from backend.utils.json_stream import ItemTooLargeError, JsonArraySplitter
+from backend.utils.spool import UploadTooLargeError, release_spooled, spool_stream, store_spooled
+from backend.workers.dedup import (
+    claim_idempotency_key,
+    confirm_idempotency_key,
+    document_fingerprint,
+    join_or_lead,
+    release_idempotency_key,
+    resolve_followers,
+)
+from backend.workers.events import DocumentEvent, publish_event, publish_events, read_events
+from backend.workers.results import lookup_result, result_key
+from backend.workers.scheduler import schedule_documents
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["documents"], default_response_class=ORJSONResponse)
+
+BATCH_INSERT_SIZE = 500
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+EVENT_ID_PATTERN = re.compile(r"^\d+-\d+$")
+
+@router.post("/documents", response_model=DocumentResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_document(
     request: DocumentRequest,
-    current_user = Depends(get_current_user)
+    http_request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue a document for AI processing; poll GET /documents/{id} for the result
+
+    Retrying with the same `Idempotency-Key` returns the document created by the first
+    attempt instead of processing it again; reusing a key for a different payload is a 422.
+    A document already processed with the same options is answered from the result store,
+    completed, without being queued.
+    """
+    repository = DocumentRepository(db)
+    options = request.options.model_dump()
+    content_sha256 = hashlib.sha256(request.content.encode()).hexdigest()
+    fingerprint = document_fingerprint(content_sha256, options)
+    document_id = str(uuid4())
+
+    if idempotency_key is not None:
+        claim = claim_idempotency_key(current_user.username, idempotency_key, document_id, fingerprint)
+        if claim is not None:
+            if claim.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used for a different request"
+                )
+            existing = repository.read_for_owner(claim.document_id, current_user.username)
+            if existing is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still being processed"
+                )
+            response.headers["Idempotent-Replayed"] = "true"
+            response.headers["Location"] = str(http_request.url_for("get_document", document_id=existing.id))
+            return DocumentResponse.model_validate(existing)
+
+    record = DocumentRecord(
+        id=document_id,
+        owner=current_user.username,
+        content=request.content,
+        content_sha256=content_sha256,
+        content_size=len(request.content.encode()),
+        options=options,
+        document_metadata=request.metadata or {},
+    )
+    stored = lookup_result(result_key(request.content, options))
+    if stored is not None:
+        record.status = DocumentStatus.COMPLETED.value
+        record.summary = stored.summary
+        record.analysis = stored.analysis
+
+    record = repository.create(record)
+    try:
+        if stored is not None and record is not None:
+            publish_event(record.id, DocumentEvent.DONE, {"summary": stored.summary, "analysis": stored.analysis})
+        else:
+            _enqueue_document(repository, record, fingerprint)
+    except HTTPException:
+        # The document was not stored or was failed, a retry with the same key must submit it again
+        if idempotency_key is not None:
+            release_idempotency_key(current_user.username, idempotency_key)
+        raise
+    if idempotency_key is not None:
+        confirm_idempotency_key(current_user.username, idempotency_key, record.id, fingerprint)
+    response.headers["Location"] = str(http_request.url_for("get_document", document_id=record.id))
+    return DocumentResponse.model_validate(record)
+
+@router.post("/documents/upload", response_model=DocumentResponse, status_code=status.HTTP_202_ACCEPTED)
+async def upload_document(
+    http_request: Request,
+    response: Response,
+    options: ProcessingOptions = Depends(),
+    filename: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """
-    Process and analyze a document using AI
+    Queue a large document sent as the raw request body (chunked transfer encoding welcome).
+
+    The body is streamed to a spool file and hashed on the fly, so API memory stays flat
+    regardless of the document size; processing options are passed as query parameters.
     """
     try:
-        result = await process_document(request.content, request.options)
-        return DocumentResponse(
-            id=result.id,
-            summary=result.summary,
-            analysis=result.analysis,
-            status="completed"
+        spooled = await spool_stream(
+            http_request.stream(), PROJECT_PATHS.UPLOADS_DATA, PROJECT_ENVS.DOCUMENT_UPLOAD_MAX_BYTES
         )
-    except Exception as e:
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Documents are limited to {PROJECT_ENVS.DOCUMENT_UPLOAD_MAX_BYTES} bytes"
+        )
+
+    repository = DocumentRepository(db)
+    references = partial(repository.count_unprocessed, spooled.sha256)
+
+    def store(path: Path) -> Optional[DocumentRecord]:
+        return repository.create(
+            DocumentRecord(
+                owner=current_user.username,
+                content_path=str(path),
+                content_sha256=spooled.sha256,
+                content_size=spooled.size,
+                options=options.model_dump(),
+                document_metadata={"filename": filename} if filename else {},
+            )
+        )
+
+    record = await run_in_threadpool(store_spooled, spooled, store, references)
+    fingerprint = document_fingerprint(spooled.sha256, options.model_dump())
+    try:
+        await run_in_threadpool(_enqueue_document, repository, record, fingerprint)
+    except HTTPException:
+        # The document was failed, its file is no longer needed unless shared
+        if record is not None:
+            await run_in_threadpool(release_spooled, Path(record.content_path), references)
+        raise
+    response.headers["Location"] = str(http_request.url_for("get_document", document_id=record.id))
+    return DocumentResponse.model_validate(record)
+
+@router.post("/documents/batch", response_model=DocumentBatchResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_document_batch(
+    http_request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue many documents at once, sent as a JSON array of DocumentRequest or as NDJSON
+    (one DocumentRequest per line, Content-Type: application/x-ndjson).
+
+    Items are validated one by one: invalid items are reported as rejected without failing
+    the batch. Both formats are parsed as the body streams in and stored in chunks, so the
+    whole batch is never held in memory; an item larger than DOCUMENT_BATCH_MAX_ITEM_BYTES
+    rejects the batch with 413. Valid items are queued behind the fair-share scheduler,
+    so a large batch only delays the documents of its own owner.
+    """
+    repository = DocumentRepository(db)
+    batch_id = str(uuid4())
+    items: list[DocumentBatchItem] = []
+    pending: list[DocumentRecord] = []
+    document_ids: list[str] = []
+
+    async def flush() -> None:
+        if not pending:
+            return
+        if await run_in_threadpool(repository.create_many, pending) is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error storing documents"
+            )
+        document_ids.extend(record.id for record in pending)
+        pending.clear()
+
+    try:
+        async for index, payload in _iter_batch_payloads(http_request):
+            if index >= PROJECT_ENVS.DOCUMENT_BATCH_MAX_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Batches are limited to {PROJECT_ENVS.DOCUMENT_BATCH_MAX_SIZE} documents"
+                )
+            try:
+                request = DocumentRequest.model_validate_json(payload)
+            except ValidationError as e:
+                error = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}" for err in e.errors())
+                items.append(DocumentBatchItem(index=index, status="rejected", error=error))
+                continue
+
+            record = DocumentRecord(
+                owner=current_user.username,
+                batch_id=batch_id,
+                content=request.content,
+                options=request.options.model_dump(),
+                document_metadata=request.metadata or {},
+            )
+            pending.append(record)
+            items.append(DocumentBatchItem(index=index, id=record.id, status=DocumentStatus.QUEUED.value))
+            if len(pending) >= BATCH_INSERT_SIZE:
+                await flush()
+        await flush()
+    except HTTPException:
+        if document_ids:
+            await run_in_threadpool(repository.fail_batch, batch_id, "Batch rejected")
+        raise
+
+    if document_ids:
+        await run_in_threadpool(publish_events, document_ids, DocumentEvent.QUEUED)
+        try:
+            await run_in_threadpool(schedule_documents, current_user.username, document_ids)
+        except Exception as e:
+            logger.error(f"Error queuing batch {batch_id}: {e}", extra={"batch_id": batch_id})
+            await run_in_threadpool(repository.fail_batch, batch_id, "Could not queue document")
+            await run_in_threadpool(
+                publish_events, document_ids, DocumentEvent.FAILED, {"error": "Could not queue document"}
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Document processing queue unavailable"
+            )
+
+    return DocumentBatchResponse(
+        batch_id=batch_id,
+        accepted=len(document_ids),
+        rejected=len(items) - len(document_ids),
+        items=items,
+    )
+
+@router.get("/documents", response_model=DocumentPage)
+def list_documents(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    status_filter: Optional[List[DocumentStatus]] = Query(None, alias="status"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description=f"Comma-separated, among {', '.join(DOCUMENT_LIST_FIELDS)}"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    List the caller's documents, newest first, one page at a time
+
+    Pagination is keyset-based: pass the `next_cursor` of a page as `cursor` to get the next
+    one, so pages stay as fast deep in the listing as at its start and documents created
+    meanwhile do not shift them. `analysis` is omitted unless requested in `fields`.
+    """
+    selected = DOCUMENT_LIST_DEFAULT_FIELDS if fields is None else [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [field for field in selected if field not in DOCUMENT_LIST_FIELDS + ("id", "created_at")]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    rows = DocumentRepository(db).list_for_owner(
+        current_user.username,
+        fields=[field for field in DOCUMENT_LIST_FIELDS if field in selected],
+        limit=limit + 1,
+        after=_decode_cursor(cursor) if cursor else None,
+        statuses=[value.value for value in status_filter] if status_filter else None,
+        created_after=_to_naive_utc(created_after),
+        created_before=_to_naive_utc(created_before),
+    )
+    if rows is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing document: {str(e)}"
+            detail="Error listing documents"
         )
+    next_cursor = _encode_cursor(rows[limit - 1]["created_at"], rows[limit - 1]["id"]) if len(rows) > limit else None
+    return DocumentPage(items=rows[:limit], next_cursor=next_cursor)
+
+@router.get("/documents/search", response_model=DocumentSearchResponse)
+def search_documents(
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Search the caller's documents by content, summary and extracted entities
+
+    `q` uses web search syntax: words, "quoted phrases", `or` and `-excluded` words. Results
+    are ranked best first, with the matching passages of the summary and content
+    highlighted with <mark> tags. Uploaded files are searchable by summary and entities only.
+    Terms matching more than 1,000 documents are ranked among the most recent ones.
+    """
+    rows = DocumentRepository(db).search_for_owner(current_user.username, q, limit)
+    if rows is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error searching documents"
+        )
+    return DocumentSearchResponse(items=rows)
 
 @router.get("/documents/{document_id}", response_model=DocumentResponse)
-async def get_document(
+def get_document(
+    document_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieve the status and, once completed, the result of a document
+    """
+    record = DocumentRepository(db).read_for_owner(document_id, current_user.username)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    return DocumentResponse.model_validate(record)
+
+@router.get("/documents/{document_id}/events")
+def stream_document_events(
     document_id: str,
-    current_user = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    last_event_id: Optional[str] = Header(None),
 ):
     """
-    Retrieve a processed document
+    Stream the progress of a document as Server-Sent Events until it is done or failed.
+
+    Events: queued, started, stage_completed, summary_tokens (the final summary as it is
+    generated, in `delta` pieces), done, failed. Reconnecting
+    clients resume after the `Last-Event-ID` they send. A document that already finished
+    gets a single done/failed event built from its stored state.
     """
-    # Implementation would fetch document from database
-    # This is a placeholder
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Endpoint not yet implemented"
+    record = DocumentRepository(db).read_for_owner(document_id, current_user.username)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    if last_event_id is not None and not EVENT_ID_PATTERN.match(last_event_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Last-Event-ID"
+        )
+
+    async def events() -> AsyncIterator[str]:
+        if record.status in (DocumentStatus.COMPLETED.value, DocumentStatus.FAILED.value):
+            event = DocumentEvent.DONE if record.status == DocumentStatus.COMPLETED.value else DocumentEvent.FAILED
+            data = DocumentResponse.model_validate(record).model_dump_json()
+            yield f"event: {event.value}\ndata: {data}\n\n"
+            return
+
+        async for entry in read_events(document_id, last_event_id):
+            if entry is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id, event, data = entry
+            yield f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+async def _iter_batch_payloads(http_request: Request) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Yield (index, raw JSON) pairs from a batch body, NDJSON lines or the items of a JSON array
+
+    Both formats are parsed as the body streams in, so only the current item is buffered.
+    Items are limited to DOCUMENT_BATCH_MAX_ITEM_BYTES.
+    """
+    max_item_bytes = PROJECT_ENVS.DOCUMENT_BATCH_MAX_ITEM_BYTES
+    content_type = http_request.headers.get("content-type", "").split(";")[0].strip().lower()
+    index = 0
+    if content_type in NDJSON_MEDIA_TYPES:
+        # Only the new chunk and the unterminated tail of the previous ones are ever split
+        tail = bytearray()
+        async for chunk in http_request.stream():
+            head, newline, rest = chunk.rpartition(b"\n")
+            if not newline:
+                tail += chunk
+                if len(tail) > max_item_bytes:
+                    raise _item_too_large(max_item_bytes)
+                continue
+            lines = (bytes(tail) + head).split(b"\n")
+            tail = bytearray(rest)
+            if len(tail) > max_item_bytes or any(len(line) > max_item_bytes for line in lines):
+                raise _item_too_large(max_item_bytes)
+            for line in lines:
+                if line.strip():
+                    yield index, line
+                    index += 1
+        if tail.strip():
+            yield index, bytes(tail)
+        return
+
+    splitter = JsonArraySplitter(max_item_bytes)
+    try:
+        async for chunk in http_request.stream():
+            for payload in splitter.feed(chunk):
+                yield index, payload
+                index += 1
+        splitter.close()
+    except ItemTooLargeError:
+        raise _item_too_large(max_item_bytes)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be a JSON array of documents or NDJSON"
+        )
+
+def _item_too_large(max_item_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Batch items are limited to {max_item_bytes} bytes"
+    )
+
+def _enqueue_document(
+    repository: DocumentRepository, record: Optional[DocumentRecord], fingerprint: Optional[str] = None
+) -> None:
+    """
+    Dispatch a stored document to the processing queue, failing the row if it cannot be queued
+
+    When a `fingerprint` is given and an identical submission is already in flight, the
+    document is attached to it instead of being queued: it gets the leader's result.
+    """
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error storing document"
+        )
+
+    if fingerprint is not None:
+        leader_id = join_or_lead(fingerprint, record.id)
+        if leader_id is not None:
+            publish_event(record.id, DocumentEvent.QUEUED, {"coalesced_with": leader_id})
+            return
+
+    # Published before the task can start, so that followers never see started before queued
+    publish_event(record.id, DocumentEvent.QUEUED)
+    try:
+        schedule_documents(record.owner, [record.id])
+    except Exception as e:
+        logger.error(f"Error queuing document {record.id}: {e}", extra={"document_id": record.id})
+        # Also ends the flight, so the next identical submission leads a new one
+        failed_ids = [record.id] + (resolve_followers(fingerprint, record.id) if fingerprint is not None else [])
+        repository.update_many(failed_ids, {"status": DocumentStatus.FAILED.value, "error": "Could not queue document"})
+        publish_events(failed_ids, DocumentEvent.FAILED, {"error": "Could not queue document"})
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Document processing queue unavailable"
+        )
+
+def _encode_cursor(created_at: datetime, document_id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), document_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, document_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), str(document_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        ) from e
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a datetime to the naive UTC stored in the `documents` table, naive ones being taken as UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -6,3 +6,10 @@ class Envs(Enum):
     PROD = "PROD"
     LOCAL = "LOCAL"
     STAGING = "STAGING"
+
+
+class DocumentStatus(Enum):
+    QUEUED = "queued"
+    STARTED = "started"
+    COMPLETED = "completed"
+    FAILED = "failed"
@@ -1,23 +1,10 @@
-import os
+from functools import lru_cache
 
 from openai import AsyncOpenAI
 from agents import Agent, OpenAIChatCompletionsModel
-from dotenv import load_dotenv
 
-from backend.core.tools import bash_command
-
-load_dotenv(override=True)
-
-
-anthropic_client = AsyncOpenAI(
-    base_url="https://api.anthropic.com/v1",  # Base URL without /chat/completions
-    api_key=os.getenv("ANTHROPIC_API_KEY"),
-    default_headers={
-        "anthropic-version": "2024-01-01",
-        "content-type": "application/json",
-    }
-)
-openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from backend.core.clients import build_anthropic_client, build_openai_client
+from backend.core.tools.bash_command import bash_command, bash_commands
 
 instructions="""
 You are a specialized documentation assistant focused on generating high-quality Python docstrings. Your primary task is to analyze Python source code files and generate comprehensive documentation that follows best practices.
@@ -68,16 +55,29 @@ You have access to:
 Always aim to produce documentation that enhances code maintainability and usability while following Python documentation best practices.
 """
 
-claude_documentation_agent = Agent(
-    name="Claude Documentation Assistant",
-    instructions=instructions,
-    model=OpenAIChatCompletionsModel(model="claude-3-7-sonnet-20250219", openai_client=anthropic_client),
-    tools=[bash_command],
-)
 
-openai_documentation_agent = Agent(
-    name="OpenAI Documentation Assistant",
-    instructions=instructions,
-    model=OpenAIChatCompletionsModel(model="gpt-4o", openai_client=openai_client),
-    tools=[bash_command],
-)
+def build_documentation_agents(openai_client: AsyncOpenAI, anthropic_client: AsyncOpenAI) -> dict[str, Agent]:
+    """Build the documentation agents on top of the given clients, keyed by provider."""
+    return {
+        "claude": Agent(
+            name="Claude Documentation Assistant",
+            instructions=instructions,
+            model=OpenAIChatCompletionsModel(model="claude-3-7-sonnet-20250219", openai_client=anthropic_client),
+            tools=[bash_command, bash_commands],
+        ),
+        "openai": Agent(
+            name="OpenAI Documentation Assistant",
+            instructions=instructions,
+            model=OpenAIChatCompletionsModel(model="gpt-4o", openai_client=openai_client),
+            tools=[bash_command, bash_commands],
+        ),
+    }
+
+
+@lru_cache(maxsize=1)
+def default_documentation_agents() -> dict[str, Agent]:
+    """Documentation agents on clients of their own, built on first use, for scripts.
+
+    The API builds its agents on the clients it owns, see `AppResources`.
+    """
+    return build_documentation_agents(build_openai_client(), build_anthropic_client())
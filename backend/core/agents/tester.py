@@ -1,23 +1,10 @@
-import os
+from functools import lru_cache
 
 from openai import AsyncOpenAI
 from agents import Agent, OpenAIChatCompletionsModel
-from dotenv import load_dotenv
 
-from backend.core.tools.bash_command import bash_command
-
-load_dotenv(override=True)
-
-
-anthropic_client = AsyncOpenAI(
-    base_url="https://api.anthropic.com/v1",  # Base URL without /chat/completions
-    api_key=os.getenv("ANTHROPIC_API_KEY"),
-    default_headers={
-        "anthropic-version": "2024-01-01",
-        "content-type": "application/json",
-    }
-)
-openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from backend.core.clients import build_anthropic_client, build_openai_client
+from backend.core.tools.bash_command import bash_command, bash_commands
 
 instructions="""
 You are a specialized pytest assistant focused on generating comprehensive test suites for Python code. Your primary task is to analyze Python source code files and generate thorough pytest test cases that ensure code quality and functionality.
@@ -82,16 +69,29 @@ Always aim to produce tests that:
 6. Help catch potential bugs early
 """
 
-claude_tester_agent = Agent(
-    name="Claude Pytest Generator",
-    instructions=instructions,
-    model=OpenAIChatCompletionsModel(model="claude-3-7-sonnet-20250219", openai_client=anthropic_client),
-    tools=[bash_command],
-)
 
-openai_tester_agent = Agent(
-    name="OpenAI Pytest Generator",
-    instructions=instructions,
-    model=OpenAIChatCompletionsModel(model="gpt-4o", openai_client=openai_client),
-    tools=[bash_command],
-)
+def build_tester_agents(openai_client: AsyncOpenAI, anthropic_client: AsyncOpenAI) -> dict[str, Agent]:
+    """Build the tester agents on top of the given clients, keyed by provider."""
+    return {
+        "claude": Agent(
+            name="Claude Pytest Generator",
+            instructions=instructions,
+            model=OpenAIChatCompletionsModel(model="claude-3-7-sonnet-20250219", openai_client=anthropic_client),
+            tools=[bash_command, bash_commands],
+        ),
+        "openai": Agent(
+            name="OpenAI Pytest Generator",
+            instructions=instructions,
+            model=OpenAIChatCompletionsModel(model="gpt-4o", openai_client=openai_client),
+            tools=[bash_command, bash_commands],
+        ),
+    }
+
+
+@lru_cache(maxsize=1)
+def default_tester_agents() -> dict[str, Agent]:
+    """Tester agents on clients of their own, built on first use, for scripts.
+
+    The API builds its agents on the clients it owns, see `AppResources`.
+    """
+    return build_tester_agents(build_openai_client(), build_anthropic_client())
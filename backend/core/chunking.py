@@ -0,0 +1,236 @@
+import re
+from dataclasses import dataclass
+from itertools import chain
+from typing import Iterable, Iterator, Optional
+
+DEFAULT_CHUNK_CHARS = 12_000
+DEFAULT_OVERLAP_CHARS = 500
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+\S")
+_UNDERLINED_HEADING = re.compile(r"^.+\n(=+|-+)\s*$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class Chunk:
+    """A contiguous part of a document, processed independently.
+
+    Attributes:
+        index: Position of the chunk in the document
+        text: Text of the chunk, including the overlap with the previous chunk
+        start: Offset in the document of the first character of the chunk's own text
+        end: Offset in the document after the last character of the chunk
+        heading: Closest heading at or before the start of the chunk, if any
+        overlap: Number of leading characters of `text` repeated from the previous chunk
+    """
+    index: int
+    text: str
+    start: int
+    end: int
+    heading: Optional[str] = None
+    overlap: int = 0
+
+
+@dataclass
+class _Block:
+    text: str
+    start: int
+    is_heading: bool
+
+
+def chunk_document(
+    text: str, max_chars: int = DEFAULT_CHUNK_CHARS, overlap_chars: int = DEFAULT_OVERLAP_CHARS
+) -> list[Chunk]:
+    """Split a document into chunks of at most `max_chars`, along its structure.
+
+    Chunks are made of whole paragraphs where possible. A heading starts a new chunk once
+    the current one is half full, so sections stay together. Paragraphs longer than a chunk
+    are split on sentence boundaries, then hard-split as a last resort. Each chunk but the
+    first is prefixed with up to `overlap_chars` of the end of the previous one, so that
+    entities and sentences straddling a boundary are seen whole by at least one chunk.
+
+    Args:
+        text: The document
+        max_chars: Maximum size of a chunk, excluding the overlap
+        overlap_chars: Maximum size of the overlap prepended to each chunk
+
+    Returns:
+        list[Chunk]: The chunks, in document order. A short document yields a single chunk
+    """
+    if len(text) <= max_chars:
+        return [Chunk(index=0, text=text, start=0, end=len(text), heading=_first_heading(text))]
+    return list(_chunk_groups(_group_blocks(_split_blocks(text, max_chars), max_chars), overlap_chars))
+
+
+def chunk_stream(
+    pieces: Iterable[str], max_chars: int = DEFAULT_CHUNK_CHARS, overlap_chars: int = DEFAULT_OVERLAP_CHARS
+) -> Iterator[Chunk]:
+    """Split a document received in pieces into chunks, like `chunk_document`.
+
+    Only the paragraphs not yet assigned to a chunk are buffered, so a spooled document can be
+    chunked from `iter_text_chunks` without ever decoding it as a single string. Paragraphs
+    longer than `max_chars` are split as they arrive.
+
+    Args:
+        pieces: Consecutive pieces of the document
+        max_chars: Maximum size of a chunk, excluding the overlap
+        overlap_chars: Maximum size of the overlap prepended to each chunk
+
+    Yields:
+        Chunk: The chunks, in document order
+    """
+    pieces = iter(pieces)
+    head = ""
+    for piece in pieces:
+        head += piece
+        if len(head) > max_chars:
+            break
+    else:
+        yield Chunk(index=0, text=head, start=0, end=len(head), heading=_first_heading(head))
+        return
+    blocks = _stream_blocks(chain([head], pieces), max_chars)
+    yield from _chunk_groups(_group_blocks(blocks, max_chars), overlap_chars)
+
+
+def _group_blocks(blocks: Iterable[_Block], max_chars: int) -> Iterator[list[_Block]]:
+    """Consecutive blocks packed into groups of at most `max_chars`, headings starting a new group when half full."""
+    current: list[_Block] = []
+    current_size = 0
+    for block in blocks:
+        starts_section = block.is_heading and current_size >= max_chars // 2
+        if current and (current_size + len(block.text) > max_chars or starts_section):
+            yield current
+            current, current_size = [], 0
+        current.append(block)
+        current_size += len(block.text) + 2
+    if current:
+        yield current
+
+
+def _chunk_groups(groups: Iterable[list[_Block]], overlap_chars: int) -> Iterator[Chunk]:
+    heading = None
+    previous_text = ""
+    for index, group in enumerate(groups):
+        if not group[0].is_heading:
+            group_heading = heading
+        else:
+            group_heading = group[0].text
+        heading = next((block.text for block in reversed(group) if block.is_heading), heading)
+
+        own_text = "\n\n".join(block.text for block in group)
+        overlap = _tail(previous_text, overlap_chars) if index else ""
+        yield Chunk(
+            index=index,
+            text=f"{overlap}\n\n{own_text}" if overlap else own_text,
+            start=group[0].start,
+            end=group[-1].start + len(group[-1].text),
+            heading=group_heading,
+            overlap=len(overlap) + 2 if overlap else 0,
+        )
+        previous_text = own_text
+
+
+def _stream_blocks(pieces: Iterable[str], max_chars: int) -> Iterator[_Block]:
+    """Blocks of `_split_blocks` over the concatenated pieces, yielded as soon as they are complete."""
+    buffer = ""
+    offset = 0
+    for piece in pieces:
+        buffer += piece
+        breaks = list(_PARAGRAPH_BREAK.finditer(buffer))
+        if breaks:
+            # A break at the very end may go on in the next piece, the text after it is stripped anyway
+            for block in _split_blocks(buffer[: breaks[-1].start()], max_chars):
+                block.start += offset
+                yield block
+            offset += breaks[-1].end()
+            buffer = buffer[breaks[-1].end() :]
+        if len(buffer) > 2 * max_chars:
+            # Flush the parts of an unfinished long paragraph, but the last one which may still grow.
+            # Trailing whitespace may precede a paragraph break, so it must not count towards a split.
+            stripped = buffer.strip()
+            parts = _split_paragraph(stripped, len(buffer) - len(buffer.lstrip()), max_chars)
+            if len(parts) > 1:
+                keep_from = parts[-1].start
+                for block in parts[:-1]:
+                    block.start += offset
+                    yield block
+                offset += keep_from
+                buffer = buffer[keep_from:]
+    for block in _split_blocks(buffer, max_chars):
+        block.start += offset
+        yield block
+
+
+def _split_blocks(text: str, max_chars: int) -> list[_Block]:
+    """Paragraphs of the document with their offsets, oversized ones split to fit `max_chars`."""
+    blocks = []
+    position = 0
+    for match in [*_PARAGRAPH_BREAK.finditer(text), None]:
+        end = match.start() if match else len(text)
+        paragraph = text[position:end]
+        stripped = paragraph.strip()
+        if stripped:
+            start = position + paragraph.index(stripped[0])
+            is_heading = bool(_MARKDOWN_HEADING.match(stripped) or _UNDERLINED_HEADING.match(stripped))
+            if len(stripped) <= max_chars:
+                blocks.append(_Block(text=stripped, start=start, is_heading=is_heading))
+            else:
+                blocks.extend(_split_paragraph(stripped, start, max_chars))
+        position = match.end() if match else len(text)
+    return blocks
+
+
+def _split_paragraph(paragraph: str, start: int, max_chars: int) -> list[_Block]:
+    pieces = []
+    piece_start = 0
+    cursor = 0
+    for sentence in [*_SENTENCE_END.finditer(paragraph), None]:
+        boundary = sentence.start() if sentence else len(paragraph)
+        if boundary - piece_start > max_chars and cursor > piece_start:
+            pieces.append((piece_start, cursor))
+            piece_start = cursor
+        while boundary - piece_start > max_chars:
+            pieces.append((piece_start, piece_start + max_chars))
+            piece_start = _skip_spaces(paragraph, piece_start + max_chars)
+        cursor = sentence.end() if sentence else len(paragraph)
+    if piece_start < len(paragraph):
+        pieces.append((piece_start, len(paragraph)))
+    return [
+        _Block(text=paragraph[begin:end].strip(), start=start + begin, is_heading=False)
+        for begin, end in pieces
+        if paragraph[begin:end].strip()
+    ]
+
+
+def _skip_spaces(text: str, position: int) -> int:
+    """First non-whitespace position of `text` from `position`, so hard-split pieces start where their text does."""
+    while position < len(text) and text[position].isspace():
+        position += 1
+    return position
+
+
+def _tail(text: str, max_chars: int) -> str:
+    """End of `text` of at most `max_chars`, starting at a paragraph, sentence or word boundary."""
+    if max_chars <= 0:
+        return ""
+    if len(text) <= max_chars:
+        return text
+    tail = text[-max_chars:]
+    for separator in ("\n\n", ". ", " "):
+        position = tail.find(separator)
+        if position != -1:
+            return tail[position + len(separator) :]
+    return tail
+
+
+def _first_heading(text: str) -> Optional[str]:
+    for block in _split_blocks(text[:DEFAULT_CHUNK_CHARS], DEFAULT_CHUNK_CHARS):
+        if block.is_heading:
+            return block.text
+    return None
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+import httpx
+from openai import AsyncOpenAI
+
+from backend import API_KEYS
+
+logger = logging.getLogger(__name__)
+
+ANTHROPIC_BASE_URL = "https://api.anthropic.com/v1"  # Base URL without /chat/completions
+
+
+def build_openai_client() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=API_KEYS.OPENAI_API_KEY)
+
+
+def build_anthropic_client() -> AsyncOpenAI:
+    """OpenAI-compatible client for the Anthropic API, usable with `OpenAIChatCompletionsModel`."""
+    return AsyncOpenAI(
+        base_url=ANTHROPIC_BASE_URL,
+        api_key=API_KEYS.ANTHROPIC_API_KEY,
+        default_headers={
+            "anthropic-version": "2024-01-01",
+            "content-type": "application/json",
+        },
+    )
+
+
+async def warm_client(client: AsyncOpenAI, timeout: float = 5.0) -> bool:
+    """Open a pooled connection (DNS, TCP and TLS handshakes) to the client's API.
+
+    A single cheap `GET /models` is sent; any HTTP answer, including an authentication
+    error, leaves a warm keep-alive connection in the client pool.
+
+    Args:
+        client: The client to warm up
+        timeout: Maximum number of seconds spent on the request
+
+    Returns:
+        bool: Whether a connection could be established
+    """
+    try:
+        await asyncio.wait_for(
+            client.with_options(max_retries=0).get("/models", cast_to=httpx.Response), timeout=timeout
+        )
+    except Exception as e:
+        if not hasattr(e, "status_code"):
+            logger.warning(f"Could not warm up connection to {client.base_url}: {e}")
+            return False
+    return True
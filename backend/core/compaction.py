@@ -0,0 +1,152 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from agents import FunctionTool, function_tool
+from agents.run import CallModelData, ModelInputData
+
+from backend.core.chunking import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+TOOL_OUTPUT_TYPE = "function_call_output"
+
+
+@dataclass
+class CompactionStats:
+    """Token accounting for a compactor over one agent run.
+
+    Attributes:
+        model_calls: Number of model calls whose input went through the compactor
+        outputs_compacted: Number of tool outputs replaced by a summary, summed over model calls
+        tokens_before: Estimated input tokens before compaction, summed over model calls
+        tokens_after: Estimated input tokens after compaction, summed over model calls
+    """
+    model_calls: int = 0
+    outputs_compacted: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class ConversationCompactor:
+    """Replace old tool outputs with short summaries once they exceed a token budget.
+
+    The full outputs are archived by call id and can be read back by the agent through
+    `recall_tool`, so compaction only drops them from the re-sent history. The history kept by
+    the runner is never modified: compaction is applied to a copy before each model call.
+
+    Usage looks like:
+
+        compactor = ConversationCompactor(budget_tokens=8_000, keep_last_turns=2)
+        agent = agent.clone(tools=agent.tools + [compactor.recall_tool])
+        result = await Runner.run(agent, input, run_config=RunConfig(call_model_input_filter=compactor))
+        logger.info(f"Saved {compactor.stats.tokens_saved} tokens")
+    """
+
+    def __init__(self, budget_tokens: int = 8_000, keep_last_turns: int = 2, preview_chars: int = 300):
+        """Initialize the ConversationCompactor.
+
+        Args:
+            budget_tokens: Tool output tokens allowed in the history before old outputs are compacted
+            keep_last_turns: Number of most recent tool-calling turns whose outputs are always kept verbatim
+            preview_chars: Number of characters from the head and tail of an output kept in its summary
+        """
+        self.budget_tokens = budget_tokens
+        self.keep_last_turns = keep_last_turns
+        self.preview_chars = preview_chars
+        self.archive: dict[str, str] = {}
+        self.stats = CompactionStats()
+
+    def __call__(self, data: CallModelData) -> ModelInputData:
+        """`RunConfig.call_model_input_filter` hook."""
+        return ModelInputData(input=self.compact(data.model_data.input), instructions=data.model_data.instructions)
+
+    def compact(self, items: list[Any]) -> list[Any]:
+        """Return a copy of `items` where the oldest tool outputs are summarized to fit the budget.
+
+        Args:
+            items: Model input items, as produced by `RunResult.to_input_list()`
+
+        Returns:
+            list: The compacted items
+        """
+        outputs = self._tool_output_turns(items)
+        protected_turns = sorted({turn for _, turn in outputs})[-self.keep_last_turns :] if self.keep_last_turns else []
+        output_tokens = sum(estimate_tokens(items[index]["output"]) for index, _ in outputs)
+        tokens_before = sum(estimate_tokens(str(item)) for item in items)
+
+        compacted = list(items)
+        compacted_count = 0
+        for index, turn in outputs:
+            if output_tokens <= self.budget_tokens:
+                break
+            if turn in protected_turns:
+                continue
+            item = items[index]
+            summary = self._summarize(item["call_id"], item["output"])
+            if len(summary) >= len(item["output"]):
+                continue
+            self.archive[item["call_id"]] = item["output"]
+            compacted[index] = {**item, "output": summary}
+            output_tokens -= estimate_tokens(item["output"]) - estimate_tokens(summary)
+            compacted_count += 1
+
+        tokens_after = sum(estimate_tokens(str(item)) for item in compacted)
+        self.stats.model_calls += 1
+        self.stats.outputs_compacted += compacted_count
+        self.stats.tokens_before += tokens_before
+        self.stats.tokens_after += tokens_after
+        if compacted_count:
+            logger.debug(f"Compacted {compacted_count} tool outputs, {tokens_before} -> {tokens_after} tokens")
+        return compacted
+
+    def recall(self, call_id: str) -> Optional[str]:
+        """Full output of a compacted tool call, or None if it was never compacted."""
+        return self.archive.get(call_id)
+
+    @property
+    def recall_tool(self) -> FunctionTool:
+        """Function tool letting the agent read back a compacted tool output by call id."""
+
+        @function_tool
+        def recall_tool_output(call_id: str) -> str:
+            """Return the full output of an earlier tool call that was compacted in the conversation."""
+            return self.recall(call_id) or f"No compacted output for call id '{call_id}'"
+
+        return recall_tool_output
+
+    def reset(self) -> None:
+        """Clear the archive and the statistics before reusing the compactor for another run."""
+        self.archive.clear()
+        self.stats = CompactionStats()
+
+    def _summarize(self, call_id: str, output: str) -> str:
+        head = output[: self.preview_chars]
+        tail = output[-self.preview_chars // 2 :] if len(output) > self.preview_chars else ""
+        return (
+            f"[compacted output of call {call_id}: {len(output)} chars, {output.count(chr(10)) + 1} lines; "
+            f"use recall_tool_output to read it in full]\n{head}\n...\n{tail}"
+        )
+
+    @staticmethod
+    def _tool_output_turns(items: list[Any]) -> list[tuple[int, int]]:
+        """Indices of string tool outputs, with the turn they belong to.
+
+        Outputs of the tool calls issued by a single model response are contiguous in the
+        history, so a new turn starts whenever a tool output follows a non-output item.
+        """
+        outputs = []
+        turn = -1
+        previous_was_output = False
+        for index, item in enumerate(items):
+            is_output = isinstance(item, dict) and item.get("type") == TOOL_OUTPUT_TYPE
+            if is_output and not previous_was_output:
+                turn += 1
+            if is_output and isinstance(item.get("output"), str):
+                outputs.append((index, turn))
+            previous_was_output = is_output
+        return outputs
@@ -0,0 +1,192 @@
+import json
+import logging
+import re
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+from backend import PROJECT_PATHS
+
+logger = logging.getLogger(__name__)
+
+# Types recognized by the model, the local extractor adds EMAIL, URL and MONEY
+ENTITY_TYPES = "PERSON, ORGANIZATION, LOCATION, DATE, PRODUCT, EVENT or OTHER"
+DEFAULT_GAZETTEER_PATH = PROJECT_PATHS.EXTERNAL_DATA / "gazetteer.json"
+
+_MONTH = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sep(?:t(?:ember)?)?"
+    r"|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?"
+)
+_AMOUNT = r"\d{1,3}(?:[,\s]\d{3})*(?:\.\d+)?|\d+(?:\.\d+)?"
+_SCALE = r"(?:\s?(?:thousand|million|billion|trillion|[kKmM]|bn)\b)?"
+
+# Checked in order, an earlier pattern wins over a later one overlapping it
+_PATTERNS: list[tuple[str, re.Pattern]] = [
+    ("EMAIL", re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}\b")),
+    ("URL", re.compile(r"\b(?:https?://|www\.)[^\s<>\"'()\[\]]+[^\s<>\"'()\[\].,;:!?]")),
+    (
+        "DATE",
+        re.compile(
+            rf"\b(?:\d{{4}}-\d{{2}}-\d{{2}}"
+            rf"|\d{{1,2}}[/.]\d{{1,2}}[/.]\d{{2,4}}"
+            rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}(?:,?\s+\d{{4}})?"
+            rf"|{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?"
+            rf"|{_MONTH}\s+\d{{4}})(?!\w)"
+        ),
+    ),
+    (
+        "MONEY",
+        re.compile(
+            rf"(?:[$€£¥]\s?(?:{_AMOUNT}){_SCALE}"
+            rf"|\b(?:{_AMOUNT}){_SCALE}\s?(?:USD|EUR|GBP|JPY|CHF|dollars?|euros?|pounds?)\b)"
+        ),
+    ),
+]
+
+# Capitalized words not starting a sentence are the names only a model can classify
+_CAPITALIZED = re.compile(r"\b[A-Z][\w&'-]+")
+_SENTENCE_START = re.compile(r"(?:^|[.!?:;\n\"“(])\s*$")
+
+
+class Entity(BaseModel):
+    name: str
+    type: str = Field(description=f"One of {ENTITY_TYPES}")
+
+
+class Gazetteer:
+    """Case-insensitive dictionary matcher of known entity names, built as an Aho-Corasick automaton.
+
+    The automaton finds every name in a single pass over the text, so matching time depends
+    on the length of the text and not on the number of names.
+
+    Args:
+        names: Entity names and their type
+    """
+
+    def __init__(self, names: Iterable[tuple[str, str]] = ()):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Lengths and types of the names ending at each state, including through fail links
+        self._outputs: list[list[tuple[int, str]]] = [[]]
+        self.size = 0
+        for name, entity_type in names:
+            self._add(" ".join(name.split()).lower(), entity_type.strip().upper())
+        self._link()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _add(self, name: str, entity_type: str) -> None:
+        if not name:
+            return
+        state = 0
+        for character in name:
+            following = self._goto[state].get(character)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][character] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = following
+        self._outputs[state].append((len(name), entity_type))
+        self.size += 1
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[following] = self._goto[fallback].get(character, 0)
+                self._outputs[following] = self._outputs[following] + self._outputs[self._fail[following]]
+
+    def find(self, text: str) -> list[tuple[int, int, str]]:
+        """Every occurrence of a known name delimited by word boundaries, as `(start, end, type)`."""
+        if not self.size:
+            return []
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = "".join(character.lower()[0] for character in text)
+        matches = []
+        state = 0
+        for position, character in enumerate(folded):
+            if character.isspace():
+                character = " "
+            while state and character not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(character, 0)
+            for length, entity_type in self._outputs[state]:
+                start, end = position - length + 1, position + 1
+                starts_word = start == 0 or not folded[start - 1].isalnum()
+                if starts_word and (end == len(folded) or not folded[end].isalnum()):
+                    matches.append((start, end, entity_type))
+        return matches
+
+
+def load_gazetteer(path: Optional[Path] = None) -> Gazetteer:
+    """Build a gazetteer from a JSON file mapping entity types to lists of names.
+
+    Args:
+        path: The file, `DEFAULT_GAZETTEER_PATH` by default
+
+    Returns:
+        Gazetteer: The gazetteer, empty if the file does not exist
+    """
+    path = Path(path or DEFAULT_GAZETTEER_PATH)
+    if not path.exists():
+        logger.info(f"No gazetteer at {path}, only patterns are matched locally")
+        return Gazetteer()
+    with path.open() as file:
+        names_by_type = json.load(file)
+    return Gazetteer((name, entity_type) for entity_type, names in names_by_type.items() for name in names)
+
+
+@lru_cache(maxsize=1)
+def default_gazetteer() -> Gazetteer:
+    """The gazetteer at `DEFAULT_GAZETTEER_PATH`, built once per process."""
+    return load_gazetteer()
+
+
+def extract_local_entities(text: str, gazetteer: Optional[Gazetteer] = None) -> tuple[list[Entity], bool]:
+    """Extract the entities recognizable without a model.
+
+    Emails, URLs, dates and amounts of money are matched by patterns, and known names by
+    the gazetteer. Overlapping matches are resolved in favor of patterns, then of the
+    longest match.
+
+    Args:
+        text: The text, typically a chunk of a document
+        gazetteer: Known names, `default_gazetteer()` by default
+
+    Returns:
+        tuple: The entities in text order, and whether capitalized words not covered by them
+        remain, i.e. names only a model can classify
+    """
+    gazetteer = default_gazetteer() if gazetteer is None else gazetteer
+    candidates = []
+    for priority, (entity_type, pattern) in enumerate(_PATTERNS):
+        candidates.extend((match.start(), match.end(), entity_type, priority) for match in pattern.finditer(text))
+    candidates.extend((start, end, entity_type, len(_PATTERNS)) for start, end, entity_type in gazetteer.find(text))
+    candidates.sort(key=lambda match: (match[3], match[0] - match[1], match[0]))
+
+    covered = bytearray(len(text))
+    entities = []
+    for start, end, entity_type, _ in candidates:
+        if any(covered[start:end]):
+            continue
+        covered[start:end] = b"\x01" * (end - start)
+        entities.append((start, Entity(name=text[start:end], type=entity_type)))
+    entities.sort(key=lambda entity: entity[0])
+
+    unresolved = any(
+        not covered[match.start()] and not _SENTENCE_START.search(text, max(match.start() - 8, 0), match.start())
+        for match in _CAPITALIZED.finditer(text)
+    )
+    return [entity for _, entity in entities], unresolved
@@ -0,0 +1,150 @@
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from backend.core.chunking import estimate_tokens
+
+# Above this many sentences the similarity graph gets too large, sentences are scored against the centroid
+TEXTRANK_MAX_SENTENCES = 2_000
+MAX_FEATURES = 4_096
+BATCH_ROWS = 1_024
+DAMPING = 0.85
+
+_SENTENCE = re.compile(r"[^\n.!?]+(?:[.!?]+[\"')\]]*|\n|$)")
+_WORD = re.compile(r"\w\w+", re.UNICODE)
+
+
+@dataclass
+class ExtractiveSummary:
+    """Most salient sentences of a document, in document order.
+
+    Attributes:
+        text: The selected sentences, paragraphs of the document kept on separate lines
+        sentences: Number of sentences selected
+        total_sentences: Number of sentences in the document
+        tokens_before: Estimated tokens of the document
+        tokens_after: Estimated tokens of `text`
+    """
+    text: str
+    sentences: int
+    total_sentences: int
+    tokens_before: int
+    tokens_after: int
+
+
+def extract_salient(text: str, budget_tokens: int) -> ExtractiveSummary:
+    """Select the most salient sentences of a document within a token budget, on CPU.
+
+    Sentences are represented as TF-IDF vectors and ranked with TextRank (PageRank over
+    their cosine similarity graph); very long documents are ranked by similarity to the
+    document centroid instead. The best sentences are taken greedily until the budget is
+    spent and returned in document order. Documents within the budget are returned as is.
+
+    Args:
+        text: The document
+        budget_tokens: Maximum number of tokens of the result, estimated like `estimate_tokens`
+
+    Returns:
+        ExtractiveSummary: The selected content
+    """
+    tokens_before = estimate_tokens(text)
+    spans = [match.span() for match in _SENTENCE.finditer(text) if match.group().strip()]
+    if tokens_before <= budget_tokens or len(spans) < 2:
+        return ExtractiveSummary(text, len(spans), len(spans), tokens_before, tokens_before)
+
+    sentences = [text[start:end].strip() for start, end in spans]
+    scores = score_sentences(sentences)
+
+    selected = []
+    spent = 0
+    for index in np.argsort(-scores, kind="stable"):
+        cost = estimate_tokens(sentences[index]) + 1
+        if spent + cost > budget_tokens:
+            continue
+        selected.append(index)
+        spent += cost
+    selected.sort()
+
+    parts = []
+    for position, index in enumerate(selected):
+        if position and "\n" in text[spans[selected[position - 1]][1] : spans[index][0]]:
+            parts.append("\n")
+        elif position:
+            parts.append(" ")
+        parts.append(sentences[index])
+    summary = "".join(parts)
+    return ExtractiveSummary(summary, len(selected), len(sentences), tokens_before, estimate_tokens(summary))
+
+
+def score_sentences(sentences: list[str]) -> np.ndarray:
+    """Salience score of each sentence, higher is more central to the document."""
+    vectorizer = _TfidfVectorizer(sentences)
+    if len(sentences) > TEXTRANK_MAX_SENTENCES:
+        # Vectors are built in row batches to bound memory on very long documents
+        batches = [
+            range(start, min(start + BATCH_ROWS, len(sentences))) for start in range(0, len(sentences), BATCH_ROWS)
+        ]
+        centroid = sum(vectorizer.transform(rows).sum(axis=0) for rows in batches)
+        centroid /= np.linalg.norm(centroid) or 1.0
+        return np.concatenate([vectorizer.transform(rows) @ centroid for rows in batches])
+
+    vectors = vectorizer.transform(range(len(sentences)))
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0)
+
+    n = len(sentences)
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(50):
+        updated = (1 - DAMPING) / n + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+class _TfidfVectorizer:
+    """L2-normalized TF-IDF vectors of sentences, over the terms found in at least two of them."""
+
+    def __init__(self, sentences: list[str]):
+        self.tokenized = [_WORD.findall(sentence.lower()) for sentence in sentences]
+        document_frequency: dict[str, int] = {}
+        for tokens in self.tokenized:
+            for token in set(tokens):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+
+        # Terms found in a single sentence do not link sentences together
+        shared = sorted((term for term, count in document_frequency.items() if count > 1), key=document_frequency.get)
+        self.vocabulary = {term: column for column, term in enumerate(shared[-MAX_FEATURES:])}
+        self.idf = np.ones(max(len(self.vocabulary), 1), dtype=np.float32)
+        for term, column in self.vocabulary.items():
+            self.idf[column] = np.log(len(sentences) / document_frequency[term]) + 1.0
+
+    def transform(self, rows: range) -> np.ndarray:
+        vectors = np.zeros((len(rows), len(self.idf)), dtype=np.float32)
+        for row, index in enumerate(rows):
+            for token in self.tokenized[index]:
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    vectors[row, column] += 1.0
+        vectors = np.log1p(vectors) * self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # python -m backend.core.extractive <file> [budget_tokens]
+    document = open(sys.argv[1]).read()
+    started = time.perf_counter()
+    result = extract_salient(document, int(sys.argv[2]) if len(sys.argv) > 2 else 2_000)
+    print(result.text)
+    print(
+        f"\n{result.sentences}/{result.total_sentences} sentences, {result.tokens_before} -> {result.tokens_after} "
+        f"tokens ({result.tokens_before / max(result.tokens_after, 1):.1f}x) in {time.perf_counter() - started:.3f}s",
+        file=sys.stderr,
+    )
@@ -0,0 +1,153 @@
+import ast
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+
+DEFAULT_BUDGET_CHARS = 24_000
+TRUNCATION_MARKER = "\n# ... truncated ...\n"
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+@dataclass
+class PrefetchedSection:
+    """A titled chunk of source inlined into the agent input.
+
+    Attributes:
+        title: Short description of the section (e.g. "Target unit `Foo.bar`")
+        text: The inlined source text
+    """
+    title: str
+    text: str
+
+
+@dataclass
+class PrefetchedContext:
+    """Source context gathered for a unit before the agent runs.
+
+    Attributes:
+        path: The file containing the unit
+        unit: Dotted name of the unit (e.g. "Foo.bar"), None for the whole module
+        sections: Inlined sections, in priority order
+        truncated: Whether some content was cut to fit the budget
+    """
+    path: Path
+    unit: Optional[str]
+    sections: list[PrefetchedSection] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def size(self) -> int:
+        return sum(len(section.text) for section in self.sections)
+
+    def render(self) -> str:
+        """Render the context as a markdown block to prepend to the agent input."""
+        parts = [
+            f"The following source from `{self.path}` has already been read for you; "
+            "do not run commands to read it again."
+        ]
+        for section in self.sections:
+            parts.append(f"### {section.title}\n```python\n{section.text}\n```")
+        return "\n\n".join(parts)
+
+
+def prefetch_context(
+    path: Union[str, Path], unit: Optional[str] = None, budget_chars: int = DEFAULT_BUDGET_CHARS
+) -> PrefetchedContext:
+    """Collect the source an agent needs to document or test a unit, within a fixed budget.
+
+    Sections are added in priority order until `budget_chars` is spent:
+
+    1. the target unit (or the whole module when `unit` is None)
+    2. the module header: docstring, imports and module-level assignments
+    3. neighbors: signatures and first docstring lines of the other top-level definitions,
+       those referenced by the target first, then by distance to the target
+
+    The output only depends on the file content and the arguments, so the same unit always
+    produces the same input.
+
+    Args:
+        path: The Python file containing the unit
+        unit: Dotted name of a function, class or method (e.g. "Foo.bar"). None for the whole module
+        budget_chars: Maximum number of source characters to inline
+
+    Returns:
+        PrefetchedContext: The gathered context
+
+    Raises:
+        ValueError: If `unit` is not defined in the file
+        SyntaxError: If the file cannot be parsed
+    """
+    path = Path(path)
+    source = path.read_text()
+    tree = ast.parse(source)
+    context = PrefetchedContext(path=path, unit=unit)
+    remaining = budget_chars
+
+    def add(title: str, text: str) -> None:
+        nonlocal remaining
+        if remaining <= 0 or not text:
+            context.truncated = context.truncated or bool(text)
+            return
+        if len(text) > remaining:
+            text = text[: max(0, remaining - len(TRUNCATION_MARKER))] + TRUNCATION_MARKER
+            context.truncated = True
+        context.sections.append(PrefetchedSection(title=title, text=text))
+        remaining -= len(text)
+
+    if unit is None:
+        add(f"Module `{path.name}`", source)
+        return context
+
+    target = _find_unit(tree, unit)
+    if target is None:
+        raise ValueError(f"Unit '{unit}' not found in {path}")
+
+    add(f"Target unit `{unit}`", ast.get_source_segment(source, target, padded=True) or "")
+    add("Module header", _module_header(source, tree))
+
+    top_level = [node for node in tree.body if isinstance(node, _DEFINITIONS) and node is not target]
+    referenced = {node.id for node in ast.walk(target) if isinstance(node, ast.Name)}
+    referenced |= {node.attr for node in ast.walk(target) if isinstance(node, ast.Attribute)}
+    top_level.sort(key=lambda node: (node.name not in referenced, abs(node.lineno - target.lineno), node.lineno))
+    add("Neighbors", "\n\n".join(_stub(source, node) for node in top_level))
+    return context
+
+
+def _find_unit(tree: ast.Module, unit: str) -> Optional[ast.AST]:
+    scope: list[ast.stmt] = tree.body
+    node = None
+    for name in unit.split("."):
+        node = next((child for child in scope if isinstance(child, _DEFINITIONS) and child.name == name), None)
+        if node is None:
+            return None
+        scope = node.body
+    return node
+
+
+def _module_header(source: str, tree: ast.Module) -> str:
+    lines = []
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        lines.append(f'"""{docstring}"""')
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign)):
+            lines.append(ast.get_source_segment(source, node) or "")
+    return "\n".join(lines)
+
+
+def _stub(source: str, node: ast.AST) -> str:
+    """Render a definition as its header line(s) plus the first docstring line."""
+    header_start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+    header_end = max(node.lineno, node.body[0].lineno - 1)
+    header = "\n".join(source.splitlines()[header_start - 1 : header_end]).rstrip()
+
+    docstring = ast.get_docstring(node)
+    summary = f'\n    """{docstring.splitlines()[0]}"""' if docstring else ""
+    if isinstance(node, ast.ClassDef):
+        methods = [
+            f"    def {child.name}(...)"
+            for child in node.body
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        return header + summary + ("\n" + "\n".join(methods) if methods else "")
+    return header + summary + "\n    ..."
@@ -0,0 +1,425 @@
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable, Optional, Union
+
+from agents import Agent, OpenAIChatCompletionsModel, Runner
+from openai import AsyncOpenAI
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel, Field
+
+from backend import PROJECT_ENVS
+from backend.core.chunking import DEFAULT_CHUNK_CHARS, DEFAULT_OVERLAP_CHARS, Chunk, chunk_document, chunk_stream
+from backend.core.clients import build_openai_client, warm_client
+from backend.core.entities import ENTITY_TYPES, Entity, extract_local_entities
+from backend.core.extractive import ExtractiveSummary, extract_salient
+from backend.schemas.document import ProcessingOptions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+# Summary deltas are reported in pieces of at least this many characters, to keep event streams short
+SUMMARY_DELTA_CHARS = 64
+# Types left to the model in hybrid mode, the others are extracted locally
+NAME_TYPES = "PERSON, ORGANIZATION, LOCATION, PRODUCT, EVENT or OTHER"
+
+SUMMARY_INSTRUCTIONS = """
+You summarize one part of a longer document. Other parts are summarized separately, so only
+report what this part says, faithfully and in a few sentences. The part may start with a few
+sentences overlapping the previous part. Answer with the summary only.
+"""
+
+ENTITIES_INSTRUCTIONS = f"""
+You extract the named entities mentioned in one part of a longer document, with their type
+among {ENTITY_TYPES}. The part may start with a few sentences overlapping the previous part.
+"""
+
+NAMES_INSTRUCTIONS = f"""
+You extract the names mentioned in one part of a longer document, with their type among
+{NAME_TYPES}. Dates, amounts of money, email addresses and URLs are extracted separately, do
+not report them. The part may start with a few sentences overlapping the previous part.
+"""
+
+REDUCE_INSTRUCTIONS = """
+You merge the summaries of consecutive parts of a document into a single summary of the
+whole document. Keep the order of the document, remove repetitions caused by overlapping
+parts, and do not add information absent from the summaries. Answer with the summary only.
+"""
+
+QUESTIONS_INSTRUCTIONS = """
+You write questions a reader should be able to answer after reading a document, given its
+summary. Write between 3 and 7 questions.
+"""
+
+
+class Entities(BaseModel):
+    entities: list[Entity] = Field(default_factory=list)
+
+
+class Questions(BaseModel):
+    questions: list[str] = Field(default_factory=list)
+
+
+@dataclass
+class ProcessedDocument:
+    """Result of processing a document.
+
+    Attributes:
+        summary: Summary of the whole document, None if not requested
+        analysis: Entities, questions and processing details, stored as the document analysis
+        timings: Wall-clock seconds spent in each stage
+    """
+    summary: Optional[str]
+    analysis: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class Stage:
+    """A step of the processing DAG.
+
+    Attributes:
+        name: Name of the stage, also the key of its result
+        run: Coroutine function receiving the results of `depends_on` by stage name
+        depends_on: Names of the stages whose results this stage needs
+    """
+    name: str
+    run: Callable[[dict[str, Any]], Awaitable[Any]]
+    depends_on: tuple[str, ...] = ()
+
+
+# Called with the stage name and its details when a stage completes
+StageCallback = Callable[[str, dict[str, Any]], None]
+# Called with the next piece of the final summary while it is being generated
+DeltaCallback = Callable[[str], None]
+
+
+@lru_cache(maxsize=1)
+def _client() -> AsyncOpenAI:
+    return build_openai_client()
+
+
+@lru_cache(maxsize=1)
+def _agents() -> dict[str, Agent]:
+    """Agents used by the processor, built once per process on a shared client."""
+    model = OpenAIChatCompletionsModel(model=PROJECT_ENVS.DOCUMENT_MODEL, openai_client=_client())
+    return {
+        "summary": Agent(name="Document part summarizer", instructions=SUMMARY_INSTRUCTIONS, model=model),
+        "entities": Agent(
+            name="Document part entity extractor", instructions=ENTITIES_INSTRUCTIONS, model=model, output_type=Entities
+        ),
+        "names": Agent(
+            name="Document part name extractor", instructions=NAMES_INSTRUCTIONS, model=model, output_type=Entities
+        ),
+        "reduce": Agent(name="Summary merger", instructions=REDUCE_INSTRUCTIONS, model=model),
+        "questions": Agent(
+            name="Question writer", instructions=QUESTIONS_INSTRUCTIONS, model=model, output_type=Questions
+        ),
+    }
+
+
+async def warm_up(timeout: float = 5.0) -> bool:
+    """Build the agents and open a pooled connection to the model API, e.g. when a worker process starts.
+
+    Returns:
+        bool: Whether a connection could be established
+    """
+    _agents()
+    return await warm_client(_client(), timeout)
+
+
+async def process_document(
+    content: Union[str, Iterable[str]],
+    options: ProcessingOptions,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    on_stage: Optional[StageCallback] = None,
+    on_summary_delta: Optional[DeltaCallback] = None,
+) -> ProcessedDocument:
+    """Summarize a document, extract its entities and write questions about it.
+
+    Processing is a small DAG of stages sharing the chunked document (see `chunk_document`):
+
+        extract ─┐
+        chunks ──┼─> summary ──> questions
+                 └─> entities
+
+    `extract` cuts documents longer than `options.summary_budget_tokens` down to their most
+    salient sentences on CPU (see `extract_salient`), and `summary` only sends those to the
+    model. Entities are still extracted from the whole document: depending on
+    `options.entity_mode`, by the model, by patterns and a gazetteer only (see
+    `extract_local_entities`), or locally with the model called only for chunks whose names
+    remain unresolved.
+
+    Only the stages requested by `options` (and their dependencies) run, each as soon as its
+    inputs are ready, so `summary` and `entities` run concurrently and latency follows the
+    critical path. Within a stage, chunks are processed concurrently (map) then merged
+    (reduce), so latency grows with the longest chunk rather than with the document length.
+
+    Args:
+        content: The document text, or its consecutive pieces (e.g. `iter_text_chunks` of a
+            spooled upload) to chunk it without holding it whole. The extractive pass of a
+            streamed document runs on the text of its chunks
+        options: What to produce and in which language
+        max_chars: Maximum size of a chunk
+        overlap_chars: Size of the overlap between consecutive chunks
+        max_concurrency: Maximum number of model calls in flight, across stages
+        on_stage: Callback notified when each stage completes, e.g. to report progress
+        on_summary_delta: Callback receiving the final summary as it is generated, by the
+            summary of the single chunk or by the last merge
+
+    Returns:
+        ProcessedDocument: The summary, analysis and stage timings of the document
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    streamed = not isinstance(content, str)
+
+    async def chunks_stage(inputs: dict[str, Any]) -> list[Chunk]:
+        if streamed:
+            # Reading the pieces may block, e.g. on disk
+            chunks = chunk_stream(content, max_chars=max_chars, overlap_chars=overlap_chars)
+            return await asyncio.to_thread(list, chunks)
+        return chunk_document(content, max_chars=max_chars, overlap_chars=overlap_chars)
+
+    async def extract_stage(inputs: dict[str, Any]) -> Optional[ExtractiveSummary]:
+        if not options.summary_budget_tokens:
+            return None
+        text = "\n\n".join(chunk.text[chunk.overlap :] for chunk in inputs["chunks"]) if streamed else content
+        return await asyncio.to_thread(extract_salient, text, options.summary_budget_tokens)
+
+    async def summary_stage(inputs: dict[str, Any]) -> str:
+        extract = inputs["extract"]
+        chunks = inputs["chunks"]
+        if extract is not None and extract.tokens_after < extract.tokens_before:
+            chunks = chunk_document(extract.text, max_chars=max_chars, overlap_chars=overlap_chars)
+        # The summary of a single chunk is the final summary, stream it
+        on_delta = on_summary_delta if len(chunks) == 1 else None
+        summaries = await asyncio.gather(
+            *(_summarize_chunk(chunk, len(chunks), options, semaphore, on_delta) for chunk in chunks)
+        )
+        return await _merge_summaries(summaries, options, max_chars, semaphore, on_summary_delta)
+
+    async def entities_stage(inputs: dict[str, Any]) -> list[dict[str, Any]]:
+        chunks = inputs["chunks"]
+        groups = await asyncio.gather(
+            *(_chunk_entities(chunk, len(chunks), options.entity_mode, semaphore) for chunk in chunks)
+        )
+        return merge_entities(groups)
+
+    async def questions_stage(inputs: dict[str, Any]) -> list[str]:
+        prompt = f"Language: {options.language}\n\nSummary:\n{inputs['summary']}"
+        async with semaphore:
+            result = await Runner.run(_agents()["questions"], prompt)
+        return result.final_output.questions
+
+    stages = [Stage("chunks", chunks_stage)]
+    if options.summarize or options.generate_questions:
+        stages.append(Stage("extract", extract_stage, depends_on=("chunks",) if streamed else ()))
+        stages.append(Stage("summary", summary_stage, depends_on=("chunks", "extract")))
+    if options.extract_entities:
+        stages.append(Stage("entities", entities_stage, depends_on=("chunks",)))
+    if options.generate_questions:
+        stages.append(Stage("questions", questions_stage, depends_on=("summary",)))
+
+    results, timings = await run_stages(stages, on_stage)
+
+    analysis: dict[str, Any] = {
+        "chunks": len(results["chunks"]),
+        "language": options.language,
+        "model": PROJECT_ENVS.DOCUMENT_MODEL,
+    }
+    extract = results.get("extract")
+    if extract is not None and extract.tokens_after < extract.tokens_before:
+        analysis["summary_input"] = {
+            "sentences": extract.sentences,
+            "total_sentences": extract.total_sentences,
+            "tokens_before": extract.tokens_before,
+            "tokens_after": extract.tokens_after,
+        }
+    if "entities" in results:
+        analysis["entities"] = results["entities"]
+        analysis["entity_mode"] = options.entity_mode
+    if "questions" in results:
+        analysis["questions"] = results["questions"]
+    return ProcessedDocument(
+        summary=results.get("summary") if options.summarize else None, analysis=analysis, timings=timings
+    )
+
+
+async def run_stages(
+    stages: list[Stage], on_stage: Optional[StageCallback] = None
+) -> tuple[dict[str, Any], dict[str, float]]:
+    """Run a DAG of stages, each one as soon as the stages it depends on are done.
+
+    Args:
+        stages: The stages, dependencies listed before their dependents
+        on_stage: Callback notified with the stage name and `{"seconds": ...}` when a stage completes
+
+    Returns:
+        tuple: Results and wall-clock seconds of each stage, by stage name
+
+    Raises:
+        ValueError: If a stage depends on a stage not listed before it
+    """
+    tasks: dict[str, asyncio.Task] = {}
+    timings: dict[str, float] = {}
+
+    async def run(stage: Stage) -> Any:
+        inputs = {name: await tasks[name] for name in stage.depends_on}
+        started = time.perf_counter()
+        result = await stage.run(inputs)
+        timings[stage.name] = round(time.perf_counter() - started, 3)
+        _notify(on_stage, stage.name, {"seconds": timings[stage.name]})
+        return result
+
+    for stage in stages:
+        unknown = [name for name in stage.depends_on if name not in tasks]
+        if unknown:
+            for task in tasks.values():
+                task.cancel()
+            raise ValueError(f"Stage '{stage.name}' depends on unknown or later stages: {unknown}")
+        tasks[stage.name] = asyncio.create_task(run(stage), name=f"stage:{stage.name}")
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return {name: task.result() for name, task in tasks.items()}, timings
+
+
+def merge_entities(groups: list[list[Entity]]) -> list[dict[str, Any]]:
+    """Deduplicate the entities found in several chunks.
+
+    Entities are the same when their type and their case- and spacing-insensitive names
+    match. The spelling of the first occurrence is kept.
+
+    Args:
+        groups: Entities of each chunk
+
+    Returns:
+        list[dict]: Entities as `{"name", "type", "mentions"}`, `mentions` being the number of
+        chunks mentioning the entity, most mentioned first
+    """
+    merged: dict[tuple[str, str], dict[str, Any]] = {}
+    for entities in groups:
+        seen_in_chunk = set()
+        for entity in entities:
+            entity_type = entity.type.strip().upper()
+            key = (_normalize_name(entity.name), entity_type)
+            if not key[0] or key in seen_in_chunk:
+                continue
+            seen_in_chunk.add(key)
+            if key not in merged:
+                merged[key] = {"name": " ".join(entity.name.split()), "type": entity_type, "mentions": 0}
+            merged[key]["mentions"] += 1
+    return sorted(merged.values(), key=lambda entity: entity["mentions"], reverse=True)
+
+
+def _chunk_prompt(chunk: Chunk, chunk_count: int) -> str:
+    section = f"Section: {chunk.heading}\n" if chunk.heading else ""
+    return f"{section}Part {chunk.index + 1} of {chunk_count}:\n\n{chunk.text}"
+
+
+async def _summarize_chunk(
+    chunk: Chunk,
+    chunk_count: int,
+    options: ProcessingOptions,
+    semaphore: asyncio.Semaphore,
+    on_delta: Optional[DeltaCallback] = None,
+) -> str:
+    prompt = f"Language of the summary: {options.language}\n{_chunk_prompt(chunk, chunk_count)}"
+    async with semaphore:
+        return await _run_text(_agents()["summary"], prompt, on_delta)
+
+
+async def _chunk_entities(chunk: Chunk, chunk_count: int, mode: str, semaphore: asyncio.Semaphore) -> list[Entity]:
+    """Entities of a chunk, from the model, locally, or locally then from the model for the remaining names."""
+    if mode == "accurate":
+        return await _extract_entities(chunk, chunk_count, "entities", semaphore)
+    entities, unresolved = extract_local_entities(chunk.text)
+    if mode == "fast" or not unresolved:
+        return entities
+    return entities + await _extract_entities(chunk, chunk_count, "names", semaphore)
+
+
+async def _extract_entities(chunk: Chunk, chunk_count: int, agent: str, semaphore: asyncio.Semaphore) -> list[Entity]:
+    async with semaphore:
+        result = await Runner.run(_agents()[agent], _chunk_prompt(chunk, chunk_count))
+    return result.final_output.entities
+
+
+async def _merge_summaries(
+    summaries: list[str],
+    options: ProcessingOptions,
+    max_chars: int,
+    semaphore: asyncio.Semaphore,
+    on_delta: Optional[DeltaCallback] = None,
+) -> str:
+    """Merge chunk summaries into one, in several concurrent levels when they do not fit a single call."""
+    summaries = [summary for summary in summaries if summary]
+    while len(summaries) > 1:
+        # Groups hold at least two summaries, so every level strictly reduces their number
+        groups: list[list[str]] = [[]]
+        size = 0
+        for summary in summaries:
+            if len(groups[-1]) >= 2 and size + len(summary) > max_chars:
+                groups.append([])
+                size = 0
+            groups[-1].append(summary)
+            size += len(summary)
+        # The last level merges a single group into the final summary, stream it
+        final_delta = on_delta if len(groups) == 1 else None
+        summaries = await asyncio.gather(*(_merge_group(group, options, semaphore, final_delta) for group in groups))
+    return summaries[0] if summaries else ""
+
+
+async def _merge_group(
+    summaries: list[str],
+    options: ProcessingOptions,
+    semaphore: asyncio.Semaphore,
+    on_delta: Optional[DeltaCallback] = None,
+) -> str:
+    if len(summaries) == 1:
+        return summaries[0]
+    parts = "\n\n".join(f"Part {index + 1}:\n{summary}" for index, summary in enumerate(summaries))
+    async with semaphore:
+        return await _run_text(_agents()["reduce"], f"Language of the summary: {options.language}\n\n{parts}", on_delta)
+
+
+async def _run_text(agent: Agent, prompt: str, on_delta: Optional[DeltaCallback] = None) -> str:
+    """Run an agent answering with text, streaming the answer to `on_delta` when given."""
+    if on_delta is None:
+        result = await Runner.run(agent, prompt)
+        return str(result.final_output).strip()
+
+    result = Runner.run_streamed(agent, prompt)
+    pending = ""
+    async for event in result.stream_events():
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            pending += event.data.delta
+            if len(pending) >= SUMMARY_DELTA_CHARS:
+                on_delta(pending)
+                pending = ""
+    if pending:
+        on_delta(pending)
+    return str(result.final_output).strip()
+
+
+def _normalize_name(name: str) -> str:
+    return re.sub(r"\s+", " ", name).strip(" .,;:'\"()").casefold()
+
+
+def _notify(on_stage: Optional[StageCallback], stage: str, data: dict[str, Any]) -> None:
+    if on_stage is None:
+        return
+    try:
+        on_stage(stage, data)
+    except Exception as e:
+        logger.warning(f"Stage callback failed for stage '{stage}': {e}")
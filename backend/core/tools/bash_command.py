@@ -1,8 +1,78 @@
+import asyncio
+import os
+import selectors
+import signal
 import subprocess
-from typing import Optional
-from dataclasses import dataclass
+import time
+from pathlib import Path
+from typing import Optional, Union
+from dataclasses import dataclass, field
 
-from agents import function_tool
+from agents import FunctionTool, function_tool
+
+
+@dataclass
+class ResourceLimits:
+    """Resource limits applied to every process spawned by a command.
+    
+    CPU time, address space and open files are enforced by the kernel through `ulimit`,
+    so they are inherited by the whole process tree. The output limit is enforced by the
+    tool while reading the pipes. Any field set to None disables that limit.
+    
+    Attributes:
+        cpu_seconds: Maximum CPU time per process, in seconds
+        address_space: Maximum virtual memory per process, in bytes
+        open_files: Maximum number of open file descriptors per process
+        output_bytes: Maximum combined size of stdout and stderr, in bytes
+        niceness: Scheduling niceness added to the command (0 keeps the parent's priority)
+    """
+    cpu_seconds: Optional[int] = 60
+    address_space: Optional[int] = 2 * 1024 ** 3
+    open_files: Optional[int] = 256
+    output_bytes: Optional[int] = 1024 * 1024
+    niceness: int = 10
+
+    def wrap(self, command: str) -> list[str]:
+        """Build the argv running `command` under these limits.
+        
+        Args:
+            command: The shell command to run
+            
+        Returns:
+            list[str]: The argv to pass to `subprocess.Popen`
+        """
+        ulimits = []
+        if self.cpu_seconds is not None:
+            # Soft limit delivers SIGXCPU (reported as a breach), the hard limit a second later SIGKILL
+            ulimits.append(f"ulimit -S -t {int(self.cpu_seconds)} && ulimit -H -t {int(self.cpu_seconds) + 1}")
+        if self.address_space is not None:
+            ulimits.append(f"ulimit -v {int(self.address_space) // 1024}")
+        if self.open_files is not None:
+            ulimits.append(f"ulimit -n {int(self.open_files)}")
+
+        script = f"{' && '.join(ulimits)} || exit 126\n{command}" if ulimits else command
+        argv = ["/bin/sh", "-c", script]
+        if self.niceness:
+            argv = ["nice", "-n", str(self.niceness)] + argv
+        return argv
+
+
+@dataclass
+class ResourceUsage:
+    """Resources consumed by a command and all of its reaped descendants.
+    
+    Attributes:
+        user_time: CPU time spent in user mode, in seconds
+        system_time: CPU time spent in kernel mode, in seconds
+        max_rss_kb: Peak resident set size of the largest process, in kilobytes. On Linux this
+            includes the footprint the shell inherited from the spawning process at exec time,
+            so treat it as an upper bound
+        output_bytes: Combined size of stdout and stderr produced, in bytes
+    """
+    user_time: float = 0.0
+    system_time: float = 0.0
+    max_rss_kb: int = 0
+    output_bytes: int = 0
 
 
 @dataclass
@@ -14,24 +84,42 @@ class BashCommandOutput:
         stderr: The standard error output from the command
         return_code: The command's exit code
         success: Boolean indicating if the command executed successfully
+        command: The command that produced this output
+        duration: Wall-clock execution time in seconds
+        usage: Resources consumed by the command
+        limit_exceeded: Name of the limit that was breached ("timeout", "output" or "cpu"), if any
     """
     stdout: str
     stderr: str
     return_code: int
     success: bool
+    command: str = ""
+    duration: float = 0.0
+    usage: ResourceUsage = field(default_factory=ResourceUsage)
+    limit_exceeded: Optional[str] = None
 
 
 class BashCommandTool:
     """A tool for executing bash commands with safety measures."""
     
-    def __init__(self, allowed_commands: Optional[list[str]] = None):
+    def __init__(
+        self,
+        allowed_commands: Optional[list[str]] = None,
+        limits: Optional[ResourceLimits] = None,
+        cwd: Optional[Union[str, Path]] = None,
+    ):
         """Initialize the BashCommandTool.
         
         Args:
             allowed_commands: List of allowed command prefixes. If None, all commands are allowed
                             (use with caution!)
+            limits: Resource limits applied to each execution. Defaults to `ResourceLimits()`
+            cwd: Working directory of the executed commands (e.g. a job workspace). Defaults to
+                 the current working directory of the process
         """
         self.allowed_commands = allowed_commands or []
+        self.limits = limits or ResourceLimits()
+        self.cwd = cwd
 
     def _is_command_allowed(self, command: str) -> bool:
         """Check if the command is in the allowed list.
@@ -50,6 +138,9 @@ class BashCommandTool:
     async def execute(self, command: str, timeout: int = 30) -> BashCommandOutput:
         """Execute a bash command asynchronously.
         
+        The blocking subprocess call runs in a worker thread so that several commands
+        can be awaited concurrently (see `execute_batch`).
+        
         Args:
             command: The command to execute
             timeout: Maximum execution time in seconds
@@ -59,51 +150,197 @@ class BashCommandTool:
             
         Raises:
             ValueError: If command is not in allowed list
-            subprocess.TimeoutExpired: If command execution exceeds timeout
-            subprocess.SubprocessError: If command execution fails
         """
         if not self._is_command_allowed(command):
             raise ValueError(f"Command '{command}' is not in the allowed list")
+
+        return await asyncio.to_thread(self._run, command, timeout)
+
+    async def execute_batch(
+        self, commands: list[str], max_concurrency: int = 4, timeout: int = 30
+    ) -> list[BashCommandOutput]:
+        """Execute several bash commands concurrently.
+        
+        Disallowed commands do not abort the batch; they are reported as failed entries
+        so the caller gets exactly one result per command, in input order.
+        
+        Args:
+            commands: The commands to execute
+            max_concurrency: Maximum number of commands running at the same time
+            timeout: Maximum execution time in seconds, applied to each command
             
-        try:
-            # Execute command with timeout
-            process = subprocess.run(
-                command,
-                shell=True,
-                text=True,
-                capture_output=True,
-                timeout=timeout
-            )
-            
-            return BashCommandOutput(
-                stdout=process.stdout,
-                stderr=process.stderr,
-                return_code=process.returncode,
-                success=process.returncode == 0
-            )
+        Returns:
+            list[BashCommandOutput]: One result per command, in the same order as `commands`
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_one(command: str) -> BashCommandOutput:
+            if not self._is_command_allowed(command):
+                return BashCommandOutput(
+                    stdout="",
+                    stderr=f"Command '{command}' is not in the allowed list",
+                    return_code=-1,
+                    success=False,
+                    command=command,
+                )
+            async with semaphore:
+                return await self.execute(command, timeout=timeout)
+
+        return list(await asyncio.gather(*(run_one(command) for command in commands)))
+
+    def _run(self, command: str, timeout: int) -> BashCommandOutput:
+        """Run a command synchronously and wrap the outcome in a BashCommandOutput.
+        
+        The command runs in its own process group so that the whole tree can be killed
+        when the timeout or the output limit is breached. Resource usage is collected with
+        `os.wait4` once the shell exits.
+        
+        Args:
+            command: The command to execute
+            timeout: Maximum execution time in seconds
             
-        except subprocess.TimeoutExpired as e:
-            return BashCommandOutput(
-                stdout="",
-                stderr=f"Command timed out after {timeout} seconds",
-                return_code=-1,
-                success=False
+        Returns:
+            BashCommandOutput: Object containing command execution results
+        """
+        started = time.monotonic()
+        try:
+            process = subprocess.Popen(
+                self.limits.wrap(command),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+                cwd=self.cwd,
             )
-            
-        except subprocess.SubprocessError as e:
+        except (OSError, subprocess.SubprocessError) as e:
             return BashCommandOutput(
                 stdout="",
                 stderr=str(e),
                 return_code=-1,
-                success=False
+                success=False,
+                command=command,
+                duration=time.monotonic() - started,
             )
 
+        stdout, stderr, limit_exceeded = self._collect_output(process, started + timeout)
+        if limit_exceeded:
+            self._kill_group(process.pid)
+
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = return_code = os.waitstatus_to_exitcode(status)
+        if limit_exceeded is None and return_code in (-signal.SIGXCPU, 128 + signal.SIGXCPU):
+            limit_exceeded = "cpu"
+            self._kill_group(process.pid)
+
+        usage = ResourceUsage(
+            user_time=rusage.ru_utime,
+            system_time=rusage.ru_stime,
+            max_rss_kb=rusage.ru_maxrss,
+            output_bytes=len(stdout) + len(stderr),
+        )
+        stderr_text = stderr.decode(errors="replace")
+        if limit_exceeded:
+            message = {
+                "timeout": f"Command timed out after {timeout} seconds",
+                "output": f"Command output exceeded {self.limits.output_bytes} bytes",
+                "cpu": f"Command exceeded {self.limits.cpu_seconds} CPU seconds",
+            }[limit_exceeded]
+            stderr_text = f"{stderr_text.rstrip()}\n{message}" if stderr_text else message
+
+        return BashCommandOutput(
+            stdout=stdout.decode(errors="replace"),
+            stderr=stderr_text,
+            return_code=-1 if limit_exceeded else return_code,
+            success=limit_exceeded is None and return_code == 0,
+            command=command,
+            duration=time.monotonic() - started,
+            usage=usage,
+            limit_exceeded=limit_exceeded,
+        )
+
+    def _collect_output(self, process: subprocess.Popen, deadline: float) -> tuple[bytes, bytes, Optional[str]]:
+        """Read stdout and stderr until EOF, the deadline or the output limit.
+        
+        Args:
+            process: The running process
+            deadline: `time.monotonic()` value after which the command is considered timed out
+            
+        Returns:
+            tuple: Captured stdout, captured stderr and the breached limit name (or None)
+        """
+        max_output = self.limits.output_bytes
+        buffers = {process.stdout: bytearray(), process.stderr: bytearray()}
+        total = 0
+        limit_exceeded = None
+
+        with selectors.DefaultSelector() as selector:
+            for stream in buffers:
+                selector.register(stream, selectors.EVENT_READ)
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    limit_exceeded = "timeout"
+                    break
+                for key, _ in selector.select(timeout=remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    if max_output is not None and total + len(chunk) > max_output:
+                        chunk = chunk[: max_output - total]
+                        limit_exceeded = "output"
+                    buffers[key.fileobj] += chunk
+                    total += len(chunk)
+                if limit_exceeded:
+                    break
+
+        process.stdout.close()
+        process.stderr.close()
+        return bytes(buffers[process.stdout]), bytes(buffers[process.stderr]), limit_exceeded
+
+    @staticmethod
+    def _kill_group(pid: int) -> None:
+        """Kill the process group led by `pid`, ignoring already-exited groups."""
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+BASH_TOOL_NAMES = ("bash_command", "bash_commands")
+
+
+def bash_tools(tool: Optional[BashCommandTool] = None) -> list[FunctionTool]:
+    """Build the `bash_command` and `bash_commands` agent tools on top of a BashCommandTool.
+
+    Args:
+        tool: The tool executing the commands, e.g. one bound to a job workspace. Defaults to a
+              `BashCommandTool()` running in the current working directory of the process
+
+    Returns:
+        list[FunctionTool]: The `bash_command` and `bash_commands` tools
+    """
+    tool = tool or BashCommandTool()
+
+    @function_tool
+    async def bash_command(command: str) -> BashCommandOutput:
+        """Execute a bash command."""
+        return await tool.execute(command)
+
+    @function_tool
+    async def bash_commands(commands: list[str]) -> list[BashCommandOutput]:
+        """Execute several independent bash commands concurrently and return one result per command.
+
+        Prefer this over repeated `bash_command` calls when the commands do not depend on each other
+        (e.g. reading several files or listing several directories).
+        """
+        return await tool.execute_batch(commands)
+
+    return [bash_command, bash_commands]
 
 
-@function_tool
-def bash_command(command: str) -> BashCommandOutput:
-    """Execute a bash command."""
-    return BashCommandTool().execute(command)
+bash_command, bash_commands = bash_tools()
 
 
 if __name__ == "__main__":
@@ -117,3 +354,4 @@ if __name__ == "__main__":
         print(f"Output: {result.stdout}")
     else:
         print(f"Error: {result.stderr}")
+    print(f"Usage: {result.usage}")
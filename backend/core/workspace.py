@@ -0,0 +1,236 @@
+import logging
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from agents import FunctionTool
+
+from backend.core.tools.bash_command import BashCommandTool, ResourceLimits, bash_tools
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class WorkspaceError(Exception):
+    """Raised when a workspace cannot be provisioned or removed."""
+
+
+class WorkspaceStrategy(Enum):
+    AUTO = "auto"
+    REFLINK = "reflink"
+    WORKTREE = "worktree"
+    COPY = "copy"
+    HARDLINK = "hardlink"
+
+
+@dataclass
+class Workspace:
+    """An isolated working tree provisioned for a single job.
+
+    Attributes:
+        job_id: Identifier of the job owning the workspace
+        path: Root of the workspace working tree
+        source: Repository the workspace was provisioned from
+        strategy: Strategy used to provision the workspace
+        setup_seconds: Time spent provisioning the workspace
+    """
+    job_id: str
+    path: Path
+    source: Path
+    strategy: WorkspaceStrategy
+    setup_seconds: float = 0.0
+
+    def tool(
+        self, allowed_commands: Optional[list[str]] = None, limits: Optional[ResourceLimits] = None
+    ) -> BashCommandTool:
+        """Build a BashCommandTool executing commands inside this workspace.
+
+        Args:
+            allowed_commands: List of allowed command prefixes, see `BashCommandTool`
+            limits: Resource limits applied to each execution, see `BashCommandTool`
+
+        Returns:
+            BashCommandTool: Tool whose commands run with the workspace as working directory
+        """
+        return BashCommandTool(allowed_commands=allowed_commands, limits=limits, cwd=self.path)
+
+    def agent_tools(
+        self, allowed_commands: Optional[list[str]] = None, limits: Optional[ResourceLimits] = None
+    ) -> list[FunctionTool]:
+        """Build the `bash_command` and `bash_commands` agent tools running inside this workspace.
+
+        Args:
+            allowed_commands: List of allowed command prefixes, see `BashCommandTool`
+            limits: Resource limits applied to each execution, see `BashCommandTool`
+
+        Returns:
+            list[FunctionTool]: Tools to give an agent in place of the shared `bash_command` and `bash_commands`
+        """
+        return bash_tools(self.tool(allowed_commands, limits))
+
+
+class WorkspaceManager:
+    """Provision cheap, isolated per-job working trees of a single repository.
+
+    Four strategies are available:
+
+    - `REFLINK`: copy-on-write clone of every file (`cp --reflink=always`). Near-instant and
+      almost free on disk, but only on filesystems supporting reflinks (btrfs, XFS, APFS...).
+    - `WORKTREE`: `git worktree add --detach` of the source HEAD. Shares the object store, but
+      checks out every tracked file, and does not include uncommitted changes of the source.
+    - `COPY`: plain copy of every file (`cp -a`). Works anywhere, but takes time and disk space
+      proportional to the size of the source.
+    - `HARDLINK`: hardlinks every file (`cp -al`). Near-instant and free on disk, but files are
+      shared with the source: tools that rewrite a file in place (rather than replacing it)
+      leak the change into the source and every other workspace. Never picked by `AUTO`, only
+      pass it explicitly for read-mostly jobs.
+
+    `AUTO` picks reflink when supported, then worktree for git repositories, then a full copy,
+    so the source is never shared with a workspace.
+    Only reflinks and hardlinks reliably provision in well under a second: on filesystems
+    without reflinks (ext4, overlayfs in most containers), `AUTO` falls back to a worktree,
+    whose checkout takes time proportional to the size of the repository (seconds for large
+    ones). Put the workspace root on a reflink-capable filesystem, or pass `HARDLINK`
+    explicitly for read-mostly jobs, where setup time matters. `Workspace.setup_seconds`
+    reports the actual cost.
+    """
+
+    def __init__(self, source: Union[str, Path], root: Optional[Union[str, Path]] = None):
+        """Initialize the WorkspaceManager.
+
+        Args:
+            source: Repository to provision workspaces from
+            root: Directory holding the workspaces. Must be on the same filesystem as `source`
+                  for reflinks and hardlinks, and outside it. Defaults to `workspaces` under
+                  the system temporary directory
+        """
+        self.source = Path(source).resolve()
+        self.root = Path(root or Path(tempfile.gettempdir()) / "workspaces").resolve()
+        self._supports_reflink: Optional[bool] = None
+
+        if self.root.is_relative_to(self.source):
+            raise WorkspaceError(f"Workspace root '{self.root}' cannot be inside the source '{self.source}'")
+
+    def create(self, job_id: str, strategy: WorkspaceStrategy = WorkspaceStrategy.AUTO) -> Workspace:
+        """Provision a workspace for a job.
+
+        Args:
+            job_id: Identifier of the job, used as the workspace directory name
+            strategy: Provisioning strategy
+
+        Returns:
+            Workspace: The provisioned workspace
+
+        Raises:
+            WorkspaceError: If the job id is invalid, the workspace already exists or provisioning fails
+        """
+        if not JOB_ID_PATTERN.match(job_id):
+            raise WorkspaceError(f"Invalid job id '{job_id}'")
+
+        path = self.root / job_id
+        if path.exists():
+            raise WorkspaceError(f"Workspace '{path}' already exists")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        if strategy == WorkspaceStrategy.AUTO:
+            strategy = self._pick_strategy()
+
+        started = time.monotonic()
+        if strategy == WorkspaceStrategy.WORKTREE:
+            self._run(["git", "-C", str(self.source), "worktree", "add", "--detach", str(path), "HEAD"])
+        elif strategy == WorkspaceStrategy.REFLINK:
+            self._copy(path, "--reflink=always")
+        elif strategy == WorkspaceStrategy.COPY:
+            self._copy(path)
+        elif strategy == WorkspaceStrategy.HARDLINK:
+            self._copy(path, "--link")
+        else:
+            raise WorkspaceError(f"Unsupported workspace strategy '{strategy}'")
+
+        workspace = Workspace(
+            job_id=job_id,
+            path=path,
+            source=self.source,
+            strategy=strategy,
+            setup_seconds=time.monotonic() - started,
+        )
+        logger.info(
+            f"Provisioned {strategy.value} workspace for job {job_id} in {workspace.setup_seconds:.3f}s",
+            extra={"job_id": job_id, "strategy": strategy.value, "setup_seconds": workspace.setup_seconds},
+        )
+        return workspace
+
+    def remove(self, workspace: Workspace) -> None:
+        """Delete a workspace and its working tree.
+
+        Args:
+            workspace: The workspace to delete
+        """
+        if workspace.strategy == WorkspaceStrategy.WORKTREE:
+            self._run(["git", "-C", str(self.source), "worktree", "remove", "--force", str(workspace.path)])
+        else:
+            shutil.rmtree(workspace.path, ignore_errors=True)
+
+    @contextmanager
+    def workspace(self, job_id: str, strategy: WorkspaceStrategy = WorkspaceStrategy.AUTO) -> Iterator[Workspace]:
+        """Provision a workspace for the duration of a `with` block.
+
+        Usage looks like:
+
+            manager = WorkspaceManager(repository_path)
+            with manager.workspace(job_id) as workspace:
+                result = await workspace.tool().execute("pytest -q")
+        """
+        workspace = self.create(job_id, strategy)
+        try:
+            yield workspace
+        finally:
+            self.remove(workspace)
+
+    def _pick_strategy(self) -> WorkspaceStrategy:
+        if self.supports_reflink():
+            return WorkspaceStrategy.REFLINK
+        if (self.source / ".git").exists():
+            logger.warning(f"No reflink support under '{self.root}', falling back to a git worktree checkout")
+            return WorkspaceStrategy.WORKTREE
+        logger.warning(
+            f"No reflink support under '{self.root}' and '{self.source}' is not a git repository, copying it"
+        )
+        return WorkspaceStrategy.COPY
+
+    def supports_reflink(self) -> bool:
+        """Check (once) whether files can be reflinked from the source into the workspace root."""
+        if self._supports_reflink is None:
+            probe = next((entry for entry in self.source.iterdir() if entry.is_file()), None)
+            if probe is None:
+                self._supports_reflink = False
+                return False
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            target = self.root / f".reflink-probe-{time.monotonic_ns()}"
+            result = subprocess.run(["cp", "--reflink=always", str(probe), str(target)], capture_output=True)
+            target.unlink(missing_ok=True)
+            self._supports_reflink = result.returncode == 0
+        return self._supports_reflink
+
+    def _copy(self, path: Path, *modes: str) -> None:
+        path.mkdir()
+        try:
+            self._run(["cp", "-a", *modes, f"{self.source}/.", str(path)])
+        except WorkspaceError:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def _run(argv: list[str]) -> None:
+        result = subprocess.run(argv, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise WorkspaceError(f"Command '{' '.join(argv)}' failed: {result.stderr.strip()}")
@@ -1,21 +1,163 @@
 import asyncio
-
-from agents import Agent, Runner
-
-from backend.core.tools.bash_command import bash_command
-from backend.core.agents.documentarian import claude_documentation_agent, openai_documentation_agent
-from backend.core.agents.tester import claude_tester_agent, openai_tester_agent
-
-triage_agent = Agent(
-    name="Triage agent",
-    instructions="Handoff to the appropriate agent based on the language of the request.",
-    handoffs=[claude_tester_agent, claude_documentation_agent],
-    tools=[bash_command],
-)
+import logging
+import sys
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+from agents import Agent, RunConfig, Runner, RunResult
+
+from backend.core.compaction import ConversationCompactor
+from backend.core.prefetch import DEFAULT_BUDGET_CHARS, prefetch_context
+from backend.core.tools.bash_command import BASH_TOOL_NAMES, bash_command, bash_commands
+from backend.core.workspace import Workspace, WorkspaceManager, WorkspaceStrategy
+from backend.core.agents.documentarian import default_documentation_agents
+from backend.core.agents.tester import default_tester_agents
+
+logger = logging.getLogger(__name__)
+
+
+def build_triage_agent() -> Agent:
+    """Agent handing requests off to the documentation or tester agent."""
+    return Agent(
+        name="Triage agent",
+        instructions="Handoff to the appropriate agent based on the language of the request.",
+        handoffs=[default_tester_agents()["claude"], default_documentation_agents()["claude"]],
+        tools=[bash_command, bash_commands],
+    )
+
+
+async def document_unit(
+    path: str,
+    unit: Optional[str] = None,
+    agent: Optional[Agent] = None,
+    prefetch: bool = True,
+    budget_chars: int = DEFAULT_BUDGET_CHARS,
+    compactor: Optional[ConversationCompactor] = None,
+    workspace: Optional[Workspace] = None,
+) -> RunResult:
+    """Run the documentation agent on a single unit of a file.
+
+    With `prefetch`, the unit, its module header and its neighbors are inlined into the
+    initial input so the agent does not spend turns reading the file with `bash_command`.
+    With a `workspace`, `path` is relative to it and the agent's bash tools run inside it,
+    so concurrent runs never write to the same checkout.
+
+    Args:
+        path: The Python file containing the unit
+        unit: Dotted name of the function, class or method to document. None for the whole module
+        agent: The agent to run, the Claude documentation agent by default
+        prefetch: Whether to inline the source context before running the agent
+        budget_chars: Maximum number of source characters inlined by the prefetch stage
+        compactor: Optional compactor summarizing old tool outputs before each model call.
+                   Its `stats` report the tokens saved over the run
+        workspace: Optional job workspace the agent works in, see `WorkspaceManager`
+
+    Returns:
+        RunResult: The agent run result
+    """
+    agent = agent or default_documentation_agents()["claude"]
+    target = f"`{unit}` in `{path}`" if unit else f"the module `{path}`"
+    prompt = f"Write documentation for {target}."
+    if prefetch:
+        source_path = workspace.path / path if workspace is not None else path
+        prompt = f"{prompt}\n\n{prefetch_context(str(source_path), unit, budget_chars).render()}"
+    if workspace is not None:
+        tools = [tool for tool in agent.tools if getattr(tool, "name", None) not in BASH_TOOL_NAMES]
+        agent = agent.clone(tools=tools + workspace.agent_tools())
+    if compactor is None:
+        return await Runner.run(agent, input=prompt)
+
+    agent = agent.clone(tools=agent.tools + [compactor.recall_tool])
+    result = await Runner.run(agent, input=prompt, run_config=RunConfig(call_model_input_filter=compactor))
+    logger.info(
+        f"Compaction saved {compactor.stats.tokens_saved} of {compactor.stats.tokens_before} input tokens "
+        f"over {compactor.stats.model_calls} model calls"
+    )
+    return result
+
+
+async def document_units(
+    source: str,
+    targets: list[tuple[str, Optional[str]]],
+    agent: Optional[Agent] = None,
+    strategy: WorkspaceStrategy = WorkspaceStrategy.AUTO,
+    **kwargs,
+) -> list[RunResult]:
+    """Document several units concurrently, each in its own workspace of the `source` repository.
+
+    Args:
+        source: The repository containing the units
+        targets: `(path, unit)` pairs, `path` being relative to `source`
+        agent: The agent to run, the Claude documentation agent by default
+        strategy: How workspaces are provisioned, see `WorkspaceManager`
+        **kwargs: Passed to `document_unit`
+
+    Returns:
+        list[RunResult]: The agent run results, in the order of `targets`
+    """
+    manager = WorkspaceManager(source)
+
+    async def run(index: int, path: str, unit: Optional[str]) -> RunResult:
+        workspace = await asyncio.to_thread(manager.create, f"doc-{uuid4().hex[:12]}-{index}", strategy)
+        try:
+            return await document_unit(path, unit, agent=agent, workspace=workspace, **kwargs)
+        finally:
+            await asyncio.to_thread(manager.remove, workspace)
+
+    return await asyncio.gather(*(run(index, path, unit) for index, (path, unit) in enumerate(targets)))
+
+
+def count_turns(result: RunResult) -> int:
+    """Number of model round trips an agent run took."""
+    return len(result.raw_responses)
+
+
+async def report_turns_per_unit(
+    path: str,
+    units: list[Optional[str]],
+    agent: Optional[Agent] = None,
+    source: Optional[str] = None,
+    strategy: WorkspaceStrategy = WorkspaceStrategy.AUTO,
+) -> dict:
+    """Document each unit with and without prefetch and report the model turns each run took.
+
+    Every run gets a fresh workspace of `source`, so edits made by one pass never reach the other.
+
+    Args:
+        path: The Python file containing the units
+        units: Dotted names of the units to document (None for the whole module)
+        agent: The agent to run, the Claude documentation agent by default
+        source: The repository containing `path`, the directory of `path` by default
+        strategy: How workspaces are provisioned, see `WorkspaceManager`
+
+    Returns:
+        dict: Turns per unit without and with prefetch, and their means
+    """
+    source = Path(source or Path(path).resolve().parent).resolve()
+    relative = str(Path(path).resolve().relative_to(source))
+
+    async def turns(unit: Optional[str], prefetch: bool) -> int:
+        (result,) = await document_units(
+            str(source), [(relative, unit)], agent=agent, strategy=strategy, prefetch=prefetch
+        )
+        return count_turns(result)
+
+    report = {"units": {}, "without_prefetch": 0.0, "with_prefetch": 0.0}
+    for unit in units:
+        without = await turns(unit, prefetch=False)
+        with_prefetch = await turns(unit, prefetch=True)
+        report["units"][unit or Path(path).name] = {"without_prefetch": without, "with_prefetch": with_prefetch}
+        logger.info(f"{unit or path}: {without} turns without prefetch, {with_prefetch} with prefetch")
+
+    if units:
+        report["without_prefetch"] = sum(u["without_prefetch"] for u in report["units"].values()) / len(units)
+        report["with_prefetch"] = sum(u["with_prefetch"] for u in report["units"].values()) / len(units)
+    return report
 
 
 async def main():
-    result = await Runner.run(triage_agent, input="""Write documentation for the following code:  
+    result = await Runner.run(build_triage_agent(), input="""Write documentation for the following code:  
 ```
 import asyncio
 
@@ -47,4 +189,8 @@ if __name__ == "__main__":
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if len(sys.argv) > 1:
+        # python -m backend.core.write_documentation <file.py> [unit ...]
+        print(asyncio.run(report_turns_per_unit(sys.argv[1], sys.argv[2:] or [None])))
+    else:
+        asyncio.run(main())
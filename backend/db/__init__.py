@@ -1,3 +1,3 @@
-from src.db.db import Base
+from backend.db.db import Base, session_maker
 
-__ALL__ = [Base]
+__ALL__ = [Base, session_maker]
@@ -6,7 +6,7 @@ from contextlib import contextmanager
 import sqlalchemy as sa
 from sqlalchemy.orm import Session, declarative_base
 
-from src import DATABASE_URI
+from backend import DATABASE_URI
 
 Base = declarative_base()
 UTC_TIMESTAMP = sa.text("timezone('utc', now())")
@@ -106,6 +106,14 @@ class FastAPISessionMaker:
         self._cached_engine = None
         self._cached_sessionmaker = None
 
+    def dispose(self) -> None:
+        """
+        Closes every pooled connection of the cached engine, if one was created, and resets the caches.
+        """
+        if self._cached_engine is not None:
+            self._cached_engine.dispose()
+        self.reset_cache()
+
 
 def get_engine(uri: str = DATABASE_URI) -> sa.engine.Engine:
     """
@@ -159,3 +167,6 @@ def _get_db(sessionmaker: sa.orm.sessionmaker) -> Iterator[Session]:
         raise exc
     finally:
         session.close()
+
+
+session_maker = FastAPISessionMaker(DATABASE_URI)
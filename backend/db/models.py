@@ -0,0 +1,48 @@
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred
+
+from backend.constants import DocumentStatus
+from backend.db.db import UTC_TIMESTAMP, Base
+
+# Text search configuration of `Document.search_vector`, queries must use the same one
+SEARCH_CONFIG = "english"
+# Beyond this many characters the content is not indexed, keeping vectors under the tsvector size limit
+SEARCH_CONTENT_CHARS = 100_000
+# Summary first, then entity names, then the content itself
+SEARCH_VECTOR = f"""
+setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(summary, '')), 'A')
+|| setweight(jsonb_to_tsvector(
+    '{SEARCH_CONFIG}', coalesce(jsonb_path_query_array(analysis, '$.entities[*].name'), '[]'), '["string"]'
+), 'B')
+|| setweight(to_tsvector('{SEARCH_CONFIG}', left(coalesce(content, ''), {SEARCH_CONTENT_CHARS})), 'C')
+"""
+
+
+class Document(Base):
+    __tablename__ = "documents"
+    __table_args__ = (
+        # Serves the keyset-paginated listing of an owner's documents, and lookups by owner alone
+        sa.Index("ix_documents_owner_created_at_id", "owner", "created_at", "id"),
+        # Needs the btree_gin extension, so that one index scan matches both the owner and the search
+        sa.Index("ix_documents_owner_search_vector", "owner", "search_vector", postgresql_using="gin"),
+    )
+
+    id = sa.Column(sa.String(36), primary_key=True)
+    owner = sa.Column(sa.String(255), nullable=False)
+    batch_id = sa.Column(sa.String(36), nullable=True, index=True)
+    status = sa.Column(sa.String(32), nullable=False, default=DocumentStatus.QUEUED.value)
+    content = sa.Column(sa.Text, nullable=True)
+    content_path = sa.Column(sa.Text, nullable=True)
+    content_sha256 = sa.Column(sa.String(64), nullable=True, index=True)
+    content_size = sa.Column(sa.BigInteger, nullable=True)
+    options = sa.Column(JSONB, nullable=False, default=dict)
+    document_metadata = sa.Column("metadata", JSONB, nullable=False, default=dict)
+    summary = sa.Column(sa.Text, nullable=True)
+    analysis = sa.Column(JSONB, nullable=True)
+    timings = sa.Column(JSONB, nullable=True)
+    error = sa.Column(sa.Text, nullable=True)
+    created_at = sa.Column(sa.DateTime, nullable=False, server_default=UTC_TIMESTAMP)
+    updated_at = sa.Column(sa.DateTime, nullable=False, server_default=UTC_TIMESTAMP, onupdate=UTC_TIMESTAMP)
+    # Maintained by Postgres on every write, deferred so that reading a document does not load it
+    search_vector = deferred(sa.Column(TSVECTOR, sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True))
@@ -1,5 +1,17 @@
-from backend.infrastructure.automation_agent.factory import AutomationAgentFactory
+from typing import TYPE_CHECKING, Any
+
 from backend.infrastructure.automation_agent.base import AutomationAgent
-from backend.infrastructure.automation_agent.vision import VisionAutomationAgent
+from backend.infrastructure.automation_agent.factory import AutomationAgentFactory
+
+if TYPE_CHECKING:
+    from backend.infrastructure.automation_agent.vision import VisionAutomationAgent
 
 __all__ = ['AutomationAgentFactory', 'AutomationAgent', 'VisionAutomationAgent']
+
+
+def __getattr__(name: str) -> Any:
+    if name == "VisionAutomationAgent":
+        from backend.infrastructure.automation_agent.vision import VisionAutomationAgent
+
+        return VisionAutomationAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
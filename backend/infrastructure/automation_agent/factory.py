@@ -2,7 +2,6 @@ from enum import Enum
 from typing import Optional
 
 from backend.infrastructure.automation_agent.base import AutomationAgent
-from backend.infrastructure.automation_agent.vision import VisionAutomationAgent
 from backend.infrastructure.factory import FactoryError
 
 
@@ -30,5 +29,7 @@ class AutomationAgentFactory:
 
         cls.validate_params(provider_type, kwargs)
         if provider_type == AutomationAgentType.VISION:
+            from backend.infrastructure.automation_agent.vision import VisionAutomationAgent
+
             return VisionAutomationAgent()
         raise FactoryError(f"No factory registered for provider type '{provider_type}'")
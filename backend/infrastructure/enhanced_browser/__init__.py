@@ -1,5 +1,18 @@
-from backend.infrastructure.enhanced_browser.factory import EnhancedBrowserFactory
+from typing import TYPE_CHECKING, Any
+
 from backend.infrastructure.enhanced_browser.base import EnhancedBrowser
-from backend.infrastructure.enhanced_browser._selenium import SeleniumEnhancedBrowser
+from backend.infrastructure.enhanced_browser.factory import EnhancedBrowserFactory
+
+if TYPE_CHECKING:
+    from backend.infrastructure.enhanced_browser._selenium import SeleniumEnhancedBrowser
+
+__all__ = ['EnhancedBrowserFactory', 'EnhancedBrowser', 'SeleniumEnhancedBrowser']
+
+
+def __getattr__(name: str) -> Any:
+    # selenium, cv2, numpy and pyautogui are only imported once a browser is actually needed
+    if name == "SeleniumEnhancedBrowser":
+        from backend.infrastructure.enhanced_browser._selenium import SeleniumEnhancedBrowser
 
-__all__ = ['EnhancedBrowserFactory', 'EnhancedBrowser', 'SeleniumEnhancedBrowser']
\ No newline at end of file
+        return SeleniumEnhancedBrowser
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,7 +2,7 @@ from enum import Enum
 from typing import Optional
 
 from backend.infrastructure.enhanced_browser.base import EnhancedBrowser
-from backend.infrastructure.enhanced_browser._selenium import SeleniumEnhancedBrowser
+from backend.infrastructure.factory import FactoryError
 
 
 class BrowserProviderType(Enum):
@@ -31,5 +31,7 @@ class EnhancedBrowserFactory:
 
         cls.validate_params(provider_type, kwargs)
         if provider_type == BrowserProviderType.SELENIUM:
+            from backend.infrastructure.enhanced_browser._selenium import SeleniumEnhancedBrowser
+
             return SeleniumEnhancedBrowser(chrome_driver_path=kwargs.get("chrome_driver_path"))
         raise FactoryError(f"No factory registered for provider type '{provider_type}'")
@@ -1,11 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from constants import Envs
-from utils.try_openai_agent import main
 
-app = FastAPI(title="Seraphy API", description="AI-powered document processing API")
+from backend import configure_logging
+from backend.api.compression import CompressionMiddleware
+from backend.api.metrics import MetricsMiddleware, metrics
+from backend.api.middleware import AdmissionControlMiddleware
+from backend.api.resources import AppResources
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build and warm the shared resources before serving, close them on shutdown."""
+    resources = AppResources.build()
+    await resources.warm_up()
+    app.state.resources = resources
+    try:
+        yield
+    finally:
+        await resources.close()
+
 
-# Configure CORS
+app = FastAPI(title="Seraphy API", description="AI-powered document processing API", lifespan=lifespan)
+
+# Shed load on document routes before it piles up behind a slow LLM backend. Limits are per
+# process: with N workers the API admits up to N times ADMISSION_MAX_IN_FLIGHT requests
+app.add_middleware(AdmissionControlMiddleware)
+
+# Analysis payloads can reach hundreds of KB, compress them for WAN clients
+app.add_middleware(CompressionMiddleware)
+
+# Outside admission control so it also sees the requests it sheds
+app.add_middleware(MetricsMiddleware)
+
+# Added last so it is outermost: preflight requests are answered before admission control,
+# and shed or failed responses still carry the CORS headers the frontend needs to read them
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -13,9 +45,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_route("/metrics", metrics, include_in_schema=False)
 
 # Import routers
-from api.routes import router as api_router
+from backend.api.routes import router as api_router
 
 # Include routers
 app.include_router(api_router, prefix="/api")
@@ -25,4 +58,6 @@ async def root():
     return {"message": "Welcome to Seraphy API"}
 
 if __name__ == "__main__":
-    main()
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8000)
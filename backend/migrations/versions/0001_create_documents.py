@@ -0,0 +1,47 @@
+"""Create the documents table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UTC_TIMESTAMP = sa.text("timezone('utc', now())")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("owner", sa.String(255), nullable=False),
+        sa.Column("batch_id", sa.String(36), nullable=True),
+        sa.Column("status", sa.String(32), nullable=False),
+        sa.Column("content", sa.Text, nullable=True),
+        sa.Column("content_path", sa.Text, nullable=True),
+        sa.Column("content_sha256", sa.String(64), nullable=True),
+        sa.Column("content_size", sa.BigInteger, nullable=True),
+        sa.Column("options", JSONB, nullable=False),
+        sa.Column("metadata", JSONB, nullable=False),
+        sa.Column("summary", sa.Text, nullable=True),
+        sa.Column("analysis", JSONB, nullable=True),
+        sa.Column("timings", JSONB, nullable=True),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=UTC_TIMESTAMP),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=UTC_TIMESTAMP),
+    )
+    op.create_index("ix_documents_owner", "documents", ["owner"])
+    op.create_index("ix_documents_batch_id", "documents", ["batch_id"])
+    op.create_index("ix_documents_content_sha256", "documents", ["content_sha256"])
+
+
+def downgrade() -> None:
+    op.drop_table("documents")
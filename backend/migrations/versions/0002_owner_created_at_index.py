@@ -0,0 +1,33 @@
+"""Index the keyset-paginated listing of an owner's documents
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so that submissions are not blocked while it builds
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_documents_owner_created_at_id",
+            "documents",
+            ["owner", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        # Its `owner` prefix serves lookups by owner alone
+        op.drop_index("ix_documents_owner", table_name="documents", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_documents_owner", "documents", ["owner"], postgresql_concurrently=True)
+        op.drop_index("ix_documents_owner_created_at_id", table_name="documents", postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""Add the full-text search vector of documents and its owner-scoped index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied from `backend.db.models.SEARCH_VECTOR` at this revision
+SEARCH_VECTOR = """
+setweight(to_tsvector('english', coalesce(summary, '')), 'A')
+|| setweight(jsonb_to_tsvector(
+    'english', coalesce(jsonb_path_query_array(analysis, '$.entities[*].name'), '[]'), '["string"]'
+), 'B')
+|| setweight(to_tsvector('english', left(coalesce(content, ''), 100000)), 'C')
+"""
+
+
+def upgrade() -> None:
+    # GIN operator classes for scalar columns, to index `owner` alongside the vector
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    # Rewrites the table to compute the vector of existing documents
+    op.add_column(
+        "documents",
+        sa.Column("search_vector", TSVECTOR, sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_documents_owner_search_vector",
+            "documents",
+            ["owner", "search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_documents_owner_search_vector", table_name="documents", postgresql_concurrently=True)
+    op.drop_column("documents", "search_vector")
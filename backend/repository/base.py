@@ -35,6 +35,16 @@ class BaseRepository:
             self.db_session.rollback()
             return None
 
+    def create_many(self, data: list[BaseModel]) -> list[BaseModel]:
+        try:
+            self.db_session.add_all([self.model_table(**item.model_dump()) for item in data])
+            self.db_session.commit()
+            return data
+        except SQLAlchemyError as e:
+            logger.error(f"Database error occurred: {e}", extra={"error": e}, exc_info=PROJECT_ENVS.DEBUG)
+            self.db_session.rollback()
+            return None
+
     def read(self, _id: str) -> BaseModel:
         try:
             db_record = self.db_session.query(self.model_table).filter(self.model_table.id == _id).first()
@@ -47,11 +57,9 @@ class BaseRepository:
         try:
             db_record = self.db_session.query(self.model_table).filter(self.model_table.id == _id).first()
             if db_record:
-                default_fields = []
                 if isinstance(data, BaseModel):
                     data = data.model_dump()
-                    default_fields = [x for x in data.keys()]
-                fields = fields or default_fields
+                fields = fields or [x for x in data.keys()]
 
                 for field, value in data.items():
                     if field in fields and hasattr(db_record, field):
@@ -0,0 +1,183 @@
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from backend import PROJECT_ENVS
+from backend.constants import DocumentStatus
+from backend.db.models import SEARCH_CONFIG, SEARCH_CONTENT_CHARS, Document
+from backend.repository.base import BaseRepository
+from backend.schemas.document import DocumentRecord
+
+logger = logging.getLogger(__name__)
+
+# Most recent matches ranked per search, bounding its cost for terms common to many documents
+SEARCH_MAX_CANDIDATES = 1_000
+HEADLINE_OPTIONS = "MaxFragments=2, MinWords=8, MaxWords=24, FragmentDelimiter= … , StartSel=<mark>, StopSel=</mark>"
+
+
+class DocumentRepository(BaseRepository):
+    def __init__(self, db_session: Session):
+        super().__init__(db_session=db_session, model_schema=DocumentRecord, model_table=Document)
+
+    def read_for_owner(self, _id: str, owner: str) -> Optional[DocumentRecord]:
+        record = self.read(_id)
+        if record is None or record.owner != owner:
+            return None
+        return record
+
+    def list_for_owner(
+        self,
+        owner: str,
+        fields: list[str],
+        limit: int,
+        after: Optional[tuple[datetime, str]] = None,
+        statuses: Optional[list[str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> Optional[list[dict[str, Any]]]:
+        """List the documents of an owner, newest first, after a keyset cursor.
+
+        Pages are read by seeking the `(owner, created_at, id)` index to the cursor rather
+        than with OFFSET, so every page costs the same however deep it is. Only the requested
+        columns are read.
+
+        Args:
+            owner: Username of the owner
+            fields: Columns to return, besides `id` and `created_at`
+            limit: Maximum number of documents
+            after: `(created_at, id)` of the last document of the previous page
+            statuses: Only return documents in one of these statuses
+            created_after: Only return documents created at or after this UTC time
+            created_before: Only return documents created before this UTC time
+
+        Returns:
+            Optional[list[dict]]: The documents as column dictionaries, None on database error
+        """
+        columns = [Document.id, Document.created_at] + [getattr(Document, field) for field in fields]
+        query = self.db_session.query(*columns).filter(Document.owner == owner)
+        if after is not None:
+            query = query.filter(sa.tuple_(Document.created_at, Document.id) < after)
+        if statuses:
+            query = query.filter(Document.status.in_(statuses))
+        if created_after is not None:
+            query = query.filter(Document.created_at >= created_after)
+        if created_before is not None:
+            query = query.filter(Document.created_at < created_before)
+        try:
+            rows = query.order_by(Document.created_at.desc(), Document.id.desc()).limit(limit).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error occurred: {e}", extra={"error": e}, exc_info=PROJECT_ENVS.DEBUG)
+            return None
+        return [row._asdict() for row in rows]
+
+    def search_for_owner(self, owner: str, text: str, limit: int) -> Optional[list[dict[str, Any]]]:
+        """Full-text search the documents of an owner, best matches first.
+
+        `text` is parsed with `websearch_to_tsquery` ("quoted phrases", `or`, `-excluded`)
+        and matched against `search_vector` through the `(owner, search_vector)` GIN index.
+        Only the `SEARCH_MAX_CANDIDATES` most recent matches are ranked with `ts_rank_cd`,
+        summary matches weighing more than entity and content matches, so common terms do
+        not rank every document of the owner. Highlights are only computed for the returned
+        page, as `ts_headline` re-parses the text it highlights.
+
+        Args:
+            owner: Username of the owner
+            text: The search, in web search syntax
+            limit: Maximum number of documents
+
+        Returns:
+            Optional[list[dict]]: The matching documents with `rank`, `summary_highlight` and
+            `content_highlight`, None on database error
+        """
+        query = sa.func.websearch_to_tsquery(SEARCH_CONFIG, text)
+        candidates = (
+            sa.select(Document.id, Document.search_vector)
+            .where(Document.owner == owner, Document.search_vector.op("@@")(query))
+            .order_by(Document.created_at.desc(), Document.id.desc())
+            .limit(SEARCH_MAX_CANDIDATES)
+            .subquery()
+        )
+        rank = sa.func.ts_rank_cd(candidates.c.search_vector, query)
+        matches = (
+            sa.select(candidates.c.id, rank.label("rank"))
+            .order_by(rank.desc(), candidates.c.id)
+            .limit(limit)
+            .subquery()
+        )
+        statement = (
+            sa.select(
+                Document.id,
+                Document.status,
+                Document.created_at,
+                matches.c.rank,
+                sa.func.ts_headline(SEARCH_CONFIG, Document.summary, query, HEADLINE_OPTIONS).label(
+                    "summary_highlight"
+                ),
+                sa.func.ts_headline(
+                    SEARCH_CONFIG, sa.func.left(Document.content, SEARCH_CONTENT_CHARS), query, HEADLINE_OPTIONS
+                ).label("content_highlight"),
+            )
+            .join(matches, matches.c.id == Document.id)
+            .order_by(matches.c.rank.desc(), Document.id)
+        )
+        try:
+            rows = self.db_session.execute(statement).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error occurred: {e}", extra={"error": e}, exc_info=PROJECT_ENVS.DEBUG)
+            return None
+        return [row._asdict() for row in rows]
+
+    def count_unprocessed(self, content_sha256: str) -> Optional[int]:
+        """Count the queued or started documents referencing the spooled file of a content digest.
+
+        Returns:
+            Optional[int]: The number of documents, None on database error
+        """
+        unprocessed = [DocumentStatus.QUEUED.value, DocumentStatus.STARTED.value]
+        try:
+            return (
+                self.db_session.query(sa.func.count(Document.id))
+                .filter(
+                    Document.content_sha256 == content_sha256,
+                    Document.content_path.isnot(None),
+                    Document.status.in_(unprocessed),
+                )
+                .scalar()
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Database error occurred: {e}", extra={"error": e}, exc_info=PROJECT_ENVS.DEBUG)
+            return None
+
+    def update_many(self, ids: list[str], data: dict) -> int:
+        if not ids:
+            return 0
+        try:
+            row_count = (
+                self.db_session.query(Document)
+                .filter(Document.id.in_(ids))
+                .update(data, synchronize_session=False)
+            )
+            self.db_session.commit()
+            return row_count
+        except SQLAlchemyError as e:
+            logger.error(f"Database error occurred: {e}", extra={"error": e}, exc_info=PROJECT_ENVS.DEBUG)
+            self.db_session.rollback()
+            return 0
+
+    def fail_batch(self, batch_id: str, error: str) -> int:
+        try:
+            row_count = (
+                self.db_session.query(Document)
+                .filter(Document.batch_id == batch_id)
+                .update({"status": DocumentStatus.FAILED.value, "error": error}, synchronize_session=False)
+            )
+            self.db_session.commit()
+            return row_count
+        except SQLAlchemyError as e:
+            logger.error(f"Database error occurred: {e}", extra={"error": e}, exc_info=PROJECT_ENVS.DEBUG)
+            self.db_session.rollback()
+            return 0
@@ -1,13 +1,19 @@
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Literal, Optional, Any
 from datetime import datetime
 from uuid import uuid4
 
+from backend.constants import DocumentStatus
+
 class ProcessingOptions(BaseModel):
     summarize: bool = True
     extract_entities: bool = True
+    # fast: patterns and gazetteer only, accurate: model only, hybrid: the model only for names left unresolved
+    entity_mode: Literal["fast", "accurate", "hybrid"] = "hybrid"
     generate_questions: bool = False
     language: str = "en"
+    # Longer documents are cut down to their most salient sentences before being summarized, None to disable
+    summary_budget_tokens: Optional[int] = Field(default=6_000, ge=256)
 
 class DocumentRequest(BaseModel):
     content: str
@@ -18,11 +24,65 @@ class DocumentResponse(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
     summary: Optional[str] = None
     analysis: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, float]] = None
     status: str
+    error: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    # Datetimes are serialized to ISO 8601 by pydantic-core, as the former `json_encoders` did
+    model_config = ConfigDict(from_attributes=True)
+
+# Fields of DocumentResponse that listings can select, `id` and `created_at` are always included
+DOCUMENT_LIST_FIELDS = ("status", "summary", "analysis", "timings", "error", "updated_at")
+DOCUMENT_LIST_DEFAULT_FIELDS = ("status", "summary", "timings", "error", "updated_at")
+
+class DocumentPage(BaseModel):
+    """A page of documents, newest first. Pass `next_cursor` as `cursor` to get the next page."""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+class DocumentSearchHit(BaseModel):
+    """A document matching a search, with the matching passages of its summary and content."""
+    id: str
+    status: str
+    created_at: datetime
+    rank: float
+    summary_highlight: Optional[str] = None
+    content_highlight: Optional[str] = None
+
+class DocumentSearchResponse(BaseModel):
+    items: List[DocumentSearchHit]
+
+class DocumentRecord(BaseModel):
+    """A row of the `documents` table, tracking a processing job and its result."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    owner: str
+    batch_id: Optional[str] = None
+    status: str = DocumentStatus.QUEUED.value
+    content: Optional[str] = None
+    content_path: Optional[str] = None
+    content_sha256: Optional[str] = None
+    content_size: Optional[int] = None
+    options: Dict[str, Any] = Field(default_factory=dict)
+    document_metadata: Dict[str, Any] = Field(default_factory=dict)
+    summary: Optional[str] = None
+    analysis: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, float]] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class DocumentBatchItem(BaseModel):
+    index: int
+    id: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+
+class DocumentBatchResponse(BaseModel):
+    batch_id: str
+    accepted: int
+    rejected: int
+    items: List[DocumentBatchItem]
@@ -0,0 +1,195 @@
+import logging
+import logging.config
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings
+
+from backend.constants import Envs
+
+load_dotenv(override=True)
+FAKE_API_KEY: str = "FAKE_API_KEY"
+
+
+class ApiKeys(BaseSettings):
+    ANTHROPIC_API_KEY: str = os.environ.get("ANTHROPIC_API_KEY", FAKE_API_KEY)
+    COHERE_API_KEY: str = os.environ.get("COHERE_API_KEY", FAKE_API_KEY)
+    OPENAI_API_KEY: str = os.environ.get("OPENAI_API_KEY", FAKE_API_KEY)
+    VOYAGE_API_KEY: str = os.environ.get("VOYAGE_API_KEY", FAKE_API_KEY)
+    MIXEDBREAD_API_KEY: str = os.environ.get("MIXEDBREAD_API_KEY", FAKE_API_KEY)
+    GEMINI_API_KEY: str = os.environ.get("GEMINI_API_KEY", FAKE_API_KEY)
+
+    PINECONE_API_KEY: str = os.environ.get("PINECONE_API_KEY", FAKE_API_KEY)
+    PINECONE_ENV: str = os.environ.get("PINECONE_ENV", FAKE_API_KEY)
+    PINECONE_INDEX: str = os.environ.get("PINECONE_INDEX", FAKE_API_KEY)
+    PINECONE_INDEX_URL: str = os.environ.get("PINECONE_INDEX_URL", FAKE_API_KEY)
+
+    ALGOLIA_APP_ID: str = os.environ.get("ALGOLIA_APP_ID", FAKE_API_KEY)
+    ALGOLIA_SEARCH_API_KEY: str = os.environ.get("ALGOLIA_SEARCH_API_KEY", FAKE_API_KEY)
+    ALGOLIA_WRITE_API_KEY: str = os.environ.get("ALGOLIA_WRITE_API_KEY", FAKE_API_KEY)
+    ALGOLIA_INDEX: str = os.environ.get("ALGOLIA_INDEX", FAKE_API_KEY)
+
+    APIFY_API_TOKEN: str = os.environ.get("APIFY_API_TOKEN", FAKE_API_KEY)
+    BRAVE_API_KEY: str = os.environ.get("BRAVE_API_KEY", FAKE_API_KEY)
+    SERPER_API_KEY: str = os.environ.get("SERPER_API_KEY", FAKE_API_KEY)
+    GOOGLE_SERPER_API_KEY: str = os.environ.get("GOOGLE_SERPER_API_KEY", FAKE_API_KEY)
+
+    GOOGLE_API_KEY: str = os.environ.get("GOOGLE_API_KEY", FAKE_API_KEY)
+    COMET_API_KEY: str = os.environ.get("COMET_API_KEY", FAKE_API_KEY)
+    NOTION_API_KEY: str = os.environ.get("NOTION_API_KEY", FAKE_API_KEY)
+    OPENWEATHERMAP_API_KEY: str = os.environ.get("OPENWEATHERMAP_API_KEY", FAKE_API_KEY)
+    PROMPTLAYER_API_KEY: str = os.environ.get("PROMPTLAYER_API_KEY", FAKE_API_KEY)
+
+    POSTGRES_DATABASE_USERNAME: str = os.environ.get("POSTGRES_DATABASE_USERNAME", "postgres")
+    POSTGRES_DATABASE_PASSWORD: str = os.environ.get("POSTGRES_DATABASE_PASSWORD", "postgres")
+    POSTGRES_DATABASE_URL: str = os.environ.get("POSTGRES_DATABASE_URL", "127.0.0.1:5432")
+    POSTGRES_DATABASE_NAME: str = os.environ.get("POSTGRES_DATABASE_NAME", "postgres")
+
+    RECALLAI_WEBHOOK_TOKEN: str = os.environ.get("RECALLAI_WEBHOOK_TOKEN", FAKE_API_KEY)
+    RECALLAI_API_KEY: str = os.environ.get("RECALLAI_API_KEY", FAKE_API_KEY)
+    RECALLAI_TRANSCRIPTION_TOKEN: str = os.environ.get("RECALLAI_TRANSCRIPTION_TOKEN", FAKE_API_KEY)
+
+    MAILGUN_API_KEY: str = os.environ.get("MAILGUN_API_KEY", FAKE_API_KEY)
+    MAILGUN_DOMAIN: str = os.environ.get("MAILGUN_DOMAIN", FAKE_API_KEY)
+
+    ABLY_API_KEY: str = os.environ.get("ABLY_API_KEY", FAKE_API_KEY)
+
+
+class ProjectPaths(BaseSettings):
+    ROOT_PATH: Path = Path(__file__).parent.parent
+
+    DATA_PATH: Path = ROOT_PATH / "data"
+    PROJECT_PATH: Path = ROOT_PATH / "backend"
+    SPHINX_PATH: Path = ROOT_PATH / "docs"
+
+    RAW_DATA: Path = DATA_PATH / "raw"
+    PPTX_DATA: Path = DATA_PATH / "pptx"
+    LOGS_DATA: Path = DATA_PATH / "logs"
+    INTERIM_DATA: Path = DATA_PATH / "interim"
+    EXTERNAL_DATA: Path = DATA_PATH / "external"
+    PROCESSED_DATA: Path = DATA_PATH / "processed"
+    UPLOADS_DATA: Path = DATA_PATH / "uploads"
+
+
+class ProjectEnvs(BaseSettings):
+    DD_ENV: str = os.environ.get("DD_ENV", "dev")
+    LOG_LVL: str = os.environ.get("LOG_LVL", "DEBUG")
+    DEBUG: bool = os.environ.get("DEBUG", "False") == "True"
+    ENV_STATE: str = os.environ.get("ENV_STATE", "LOCAL").upper()
+    DD_AGENT_HOST: str = os.environ.get("DD_AGENT_HOST", "127.0.0.1")
+    DD_TRACE_AGENT_PORT: int = os.environ.get("DD_TRACE_AGENT_PORT", 8126)
+    GCP_SERVICE_ACCOUNT_JSON: str = os.environ.get("GCP_SERVICE_ACCOUNT_JSON", "")
+    DD_LOGS_INJECTION: bool = os.environ.get("DD_LOGS_INJECTION", "False") == "True"
+
+    REDIS_URL: str = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+    DOCUMENT_BATCH_MAX_SIZE: int = os.environ.get("DOCUMENT_BATCH_MAX_SIZE", 10_000)
+    DOCUMENT_BATCH_MAX_ITEM_BYTES: int = os.environ.get("DOCUMENT_BATCH_MAX_ITEM_BYTES", 16 * 1024 ** 2)
+    DOCUMENT_UPLOAD_MAX_BYTES: int = os.environ.get("DOCUMENT_UPLOAD_MAX_BYTES", 1024 ** 3)
+
+    ADMISSION_MAX_IN_FLIGHT: int = os.environ.get("ADMISSION_MAX_IN_FLIGHT", 64)
+    ADMISSION_MAX_IN_FLIGHT_PER_USER: int = os.environ.get("ADMISSION_MAX_IN_FLIGHT_PER_USER", 8)
+    ADMISSION_MAX_QUEUE_DEPTH: int = os.environ.get("ADMISSION_MAX_QUEUE_DEPTH", 1_000)
+    ADMISSION_RETRY_AFTER_SECONDS: int = os.environ.get("ADMISSION_RETRY_AFTER_SECONDS", 5)
+
+    SCHEDULER_MAX_DISPATCHED: int = os.environ.get("SCHEDULER_MAX_DISPATCHED", 32)
+    SCHEDULER_MAX_RUNNING_PER_OWNER: int = os.environ.get("SCHEDULER_MAX_RUNNING_PER_OWNER", 8)
+    SCHEDULER_LEASE_SECONDS: int = os.environ.get("SCHEDULER_LEASE_SECONDS", 60 * 60)
+
+    DOCUMENT_MODEL: str = os.environ.get("DOCUMENT_MODEL", "gpt-4o")
+    RESULT_STORE_TTL_SECONDS: int = os.environ.get("RESULT_STORE_TTL_SECONDS", 7 * 24 * 60 * 60)
+    RESULT_STORE_MAX_BYTES: int = os.environ.get("RESULT_STORE_MAX_BYTES", 512 * 1024 ** 2)
+
+
+PROJECT_PATHS = ProjectPaths()
+PROJECT_ENVS = ProjectEnvs()
+API_KEYS = ApiKeys()
+DATABASE_URI = f"postgresql://{API_KEYS.POSTGRES_DATABASE_USERNAME}:{API_KEYS.POSTGRES_DATABASE_PASSWORD}@{API_KEYS.POSTGRES_DATABASE_URL}/{API_KEYS.POSTGRES_DATABASE_NAME}{'?sslmode=require' if PROJECT_ENVS.ENV_STATE not in [Envs.LOCAL.value, Envs.DEV.value] else ''}"
+
+
+def get_handler():
+    return ["datadog"] if PROJECT_ENVS.ENV_STATE not in [Envs.LOCAL.value, Envs.DEV.value] else ["console"]
+
+
+def get_level():
+    return "INFO" if PROJECT_ENVS.ENV_STATE not in [Envs.LOCAL.value, Envs.DEV.value] else PROJECT_ENVS.LOG_LVL
+
+
+LOCAL_ENV_LOGGERS = ["sentence_transformers", "uvicorn", "openai", "git", "ably", "sqlalchemy.engine"]
+
+
+def get_local_env_logger():
+    if PROJECT_ENVS.ENV_STATE != Envs.LOCAL:
+        return {}
+    return {name: {"handlers": get_handler(), "level": get_level(), "propagate": False} for name in LOCAL_ENV_LOGGERS}
+
+
+def get_logging_config() -> dict:
+    """Build the logging configuration for the current environment.
+
+    Only the formatter and handler actually used are declared, so Rich is never imported
+    outside local/dev environments and python-json-logger never inside them.
+    """
+    handler = get_handler()[0]
+    if handler == "console":
+        from rich.logging import RichHandler
+
+        class RichCustomFormatter(logging.Formatter):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.rich_handler = RichHandler(rich_tracebacks=True, tracebacks_suppress=[], tracebacks_show_locals=True)
+
+        formatter = {"()": RichCustomFormatter, "format": "%(message)s", "datefmt": "<%d %b %Y | %H:%M:%S>"}
+        handler_config = {
+            "class": "rich.logging.RichHandler",
+            "level": PROJECT_ENVS.LOG_LVL,
+            "formatter": "console",
+            "rich_tracebacks": True,
+            "tracebacks_show_locals": True,
+        }
+    else:
+        from pythonjsonlogger.jsonlogger import JsonFormatter
+
+        formatter = {
+            "()": JsonFormatter,
+            "format": "%(asctime)s %(levelname)s [%(name)s] [%(filename)s:%(lineno)d] "
+            "[dd.service=%(dd.service)s dd.env=%(dd.env)s dd.version=%(dd.version)s "
+            "dd.trace_id=%(dd.trace_id)s dd.span_id=%(dd.span_id)s] - %(message)s",
+            "datefmt": "<%d %b %Y | %H:%M:%S>",
+        }
+        handler_config = {"class": "logging.StreamHandler", "formatter": "json_datadog"}
+
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {"console" if handler == "console" else "json_datadog": formatter},
+        "handlers": {handler: handler_config},
+        "loggers": {
+            "": {
+                "handlers": [handler],
+                "level": PROJECT_ENVS.LOG_LVL,
+                "propagate": True,
+            }
+            | get_local_env_logger(),
+        },
+    }
+
+
+_logging_configured = False
+
+
+def configure_logging(force: bool = False) -> None:
+    """Apply the project logging configuration, once per process.
+
+    Entry points (API, Celery worker, CLIs) call it at startup; library modules never do.
+
+    Args:
+        force: Apply the configuration again even if it was already applied
+    """
+    global _logging_configured
+    if _logging_configured and not force:
+        return
+    logging.captureWarnings(True)
+    logging.config.dictConfig(get_logging_config())
+    _logging_configured = True
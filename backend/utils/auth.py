@@ -2,14 +2,27 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from typing import Optional
 from datetime import datetime, timedelta
+import hashlib
+import time
 import jwt
 from pydantic import BaseModel
 
+from backend.utils.cache import TTLCache
+
 # This would be stored in environment variables in a real application
 SECRET_KEY = "your-secret-key-here"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Decoded claims are cached by token digest, never beyond the token's own `exp`
+TOKEN_CACHE_MAX_SIZE = 10_000
+TOKEN_CACHE_TTL_SECONDS = 300
+USER_CACHE_MAX_SIZE = 10_000
+USER_CACHE_TTL_SECONDS = 60
+
+_claims_cache = TTLCache(max_size=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+_user_cache = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 class User(BaseModel):
@@ -31,6 +44,62 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def decode_token(token: str) -> dict:
+    """
+    Decode and verify a JWT, reusing the claims of tokens already verified.
+
+    Raises:
+        jwt.PyJWTError: If the token is invalid or expired
+    """
+    key = _token_digest(token)
+    claims = _claims_cache.get(key)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = TOKEN_CACHE_TTL_SECONDS
+    if "exp" in claims:
+        ttl = min(ttl, claims["exp"] - time.time())
+    if ttl > 0:
+        _claims_cache.set(key, claims, ttl)
+    return claims
+
+def _load_user(username: str) -> Optional[User]:
+    # In a real application, you would fetch the user from a database
+    # This is a placeholder implementation
+    return User(
+        username=username,
+        email=f"{username}@example.com",
+        full_name="Sample User",
+        disabled=False
+    )
+
+def get_user(username: str) -> Optional[User]:
+    """
+    Look a user up, caching the result for USER_CACHE_TTL_SECONDS.
+    """
+    user = _user_cache.get(username)
+    if user is None:
+        user = _load_user(username)
+        if user is not None:
+            _user_cache.set(username, user)
+    return user
+
+def invalidate_token(token: str) -> None:
+    """Drop a token's cached claims, e.g. on logout or revocation."""
+    _claims_cache.pop(_token_digest(token))
+
+def invalidate_user(username: str) -> None:
+    """Drop a user's cached record, e.g. after it was updated or disabled."""
+    _user_cache.pop(username)
+
+def clear_auth_caches() -> None:
+    _claims_cache.clear()
+    _user_cache.clear()
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,7 +107,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -46,14 +115,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except jwt.PyJWTError:
         raise credentials_exception
     
-    # In a real application, you would fetch the user from a database
-    # This is a placeholder implementation
-    user = User(
-        username=token_data.username,
-        email=f"{token_data.username}@example.com",
-        full_name="Sample User",
-        disabled=False
-    )
+    user = get_user(token_data.username)
     
     if user is None:
         raise credentials_exception
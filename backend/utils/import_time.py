@@ -0,0 +1,134 @@
+"""Check the import time of the API and worker entry points against a budget.
+
+Each entry point is imported in a fresh interpreter with `python -X importtime`. Modules
+already loaded by a bare interpreter (site, encodings...) are not counted. The check fails
+when an entry point exceeds its budget, fails to import, or pulls in a forbidden module.
+
+Usage looks like:
+
+    python -m backend.utils.import_time
+    python -m backend.utils.import_time --budget backend.main=600 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Budgets in milliseconds of cumulative import time
+ENTRY_POINTS: dict[str, float] = {
+    "backend.main": 1500.0,
+    # The worker imports its tasks at startup, the model SDKs are only loaded by the first task
+    "backend.workers.tasks": 1000.0,
+}
+# Heavy optional dependencies that must only be imported on first use
+FORBIDDEN_MODULES = ("selenium", "cv2", "pyautogui", "playwright")
+
+
+@dataclass
+class ImportReport:
+    """Import cost of one entry point.
+
+    Attributes:
+        module: The entry point module
+        total_ms: Cumulative import time, excluding the interpreter startup
+        by_package: Self import time by top-level package, in milliseconds
+        forbidden: Forbidden modules imported by the entry point
+        error: Stderr of the interpreter when the import failed
+    """
+    module: str
+    total_ms: float = 0.0
+    by_package: dict[str, float] = field(default_factory=dict)
+    forbidden: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, float, float]]:
+    """Parse `-X importtime` lines into (module, depth, self_ms, cumulative_ms) tuples."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return entries
+
+
+def _run_importtime(statement: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+
+
+def measure(module: str, forbidden: tuple[str, ...] = FORBIDDEN_MODULES) -> ImportReport:
+    """Measure the import cost of a module in a fresh interpreter.
+
+    Args:
+        module: Dotted name of the module to import
+        forbidden: Top-level packages the module must not import
+
+    Returns:
+        ImportReport: The import cost of the module
+    """
+    baseline = {name for name, _, _, _ in _parse_importtime(_run_importtime("pass").stderr)}
+    result = _run_importtime(f"import {module}")
+    report = ImportReport(module=module)
+    if result.returncode != 0:
+        report.error = result.stderr.splitlines()[-1] if result.stderr else f"exit code {result.returncode}"
+        return report
+
+    by_package: defaultdict[str, float] = defaultdict(float)
+    for name, depth, self_ms, cumulative_ms in _parse_importtime(result.stderr):
+        if name in baseline:
+            continue
+        if depth == 0:
+            report.total_ms += cumulative_ms
+        by_package[name.split(".")[0]] += self_ms
+    report.by_package = dict(sorted(by_package.items(), key=lambda item: item[1], reverse=True))
+    report.forbidden = [package for package in forbidden if package in by_package]
+    return report
+
+
+def check(budgets: dict[str, float], top: int = 10) -> bool:
+    """Measure every entry point, print a report and return whether all of them are within budget."""
+    ok = True
+    for module, budget_ms in budgets.items():
+        report = measure(module)
+        if report.error:
+            print(f"FAIL {module}: import failed: {report.error}")
+            ok = False
+            continue
+
+        within_budget = report.total_ms <= budget_ms and not report.forbidden
+        ok = ok and within_budget
+        print(f"{'OK  ' if within_budget else 'FAIL'} {module}: {report.total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+        if report.forbidden:
+            print(f"     forbidden imports: {', '.join(report.forbidden)}")
+        for package, self_ms in list(report.by_package.items())[:top]:
+            print(f"     {self_ms:8.1f} ms  {package}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="Override or add an entry point budget, in milliseconds",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Number of heaviest packages listed per entry point")
+    args = parser.parse_args()
+
+    budgets = dict(ENTRY_POINTS)
+    for value in args.budget:
+        module, _, budget_ms = value.partition("=")
+        budgets[module] = float(budget_ms)
+    sys.exit(0 if check(budgets, top=args.top) else 1)
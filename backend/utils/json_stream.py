@@ -0,0 +1,141 @@
+import re
+from typing import Optional
+
+_STRUCTURAL = re.compile(rb'[\[\]{}",]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_WHITESPACE = b" \t\r\n"
+
+
+class ItemTooLargeError(ValueError):
+    """Raised when a single item of a streamed body exceeds the allowed size."""
+
+
+class JsonArraySplitter:
+    """Split a JSON array received in chunks into the raw JSON of its top-level items.
+
+    Only the array structure is scanned (brackets, commas and string boundaries), items are
+    not decoded, so each one can be validated on its own as soon as it is complete and the
+    body never has to be held in memory. Malformed items are left to the item validation;
+    a body that is not an array, is truncated or has trailing data raises `ValueError`.
+
+    Usage looks like:
+
+        splitter = JsonArraySplitter(max_item_bytes=16 * 1024 ** 2)
+        async for chunk in request.stream():
+            for item in splitter.feed(chunk):
+                ...
+        splitter.close()
+    """
+
+    def __init__(self, max_item_bytes: Optional[int] = None):
+        """Initialize the JsonArraySplitter.
+
+        Args:
+            max_item_bytes: Maximum size of an item, None for no limit
+        """
+        self.max_item_bytes = max_item_bytes
+        self._buffer = bytearray()
+        self._position = 0
+        self._item_start: Optional[int] = None
+        self._count = 0
+        self._depth = 0
+        self._in_string = False
+        self._finished = False
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """Consume a chunk of the body and return the items it completes.
+
+        Raises:
+            ValueError: If the body is not a JSON array
+            ItemTooLargeError: If the current item exceeds `max_item_bytes`
+        """
+        self._buffer += chunk
+        items = []
+        buffer = self._buffer
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, self._position)
+                if match is None:
+                    self._position = len(buffer)
+                    break
+                if match.group() == b"\\":
+                    if match.end() >= len(buffer):
+                        # The escaped character is in the next chunk
+                        self._position = match.start()
+                        break
+                    self._position = match.end() + 1
+                    continue
+                self._in_string = False
+                self._position = match.end()
+                continue
+
+            if self._item_start is None:
+                # Only whitespace may surround the array
+                match = _STRUCTURAL.search(buffer, self._position)
+                end = match.start() if match is not None else len(buffer)
+                if buffer[self._position : end].strip(_WHITESPACE) or (match is not None and self._finished):
+                    raise ValueError("Body is not a single JSON array")
+                if match is None:
+                    self._position = len(buffer)
+                    break
+                if match.group() != b"[":
+                    raise ValueError("Body is not a single JSON array")
+                self._position = match.end()
+                self._depth = 1
+                self._item_start = self._position
+                continue
+
+            match = _STRUCTURAL.search(buffer, self._position)
+            if match is None:
+                self._position = len(buffer)
+                break
+            character, self._position = match.group(), match.end()
+            if character == b'"':
+                self._in_string = True
+            elif character in b"[{":
+                self._depth += 1
+            elif character in b"]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    item = bytes(buffer[self._item_start : match.start()]).strip(_WHITESPACE)
+                    if item:
+                        items.append(item)
+                        self._count += 1
+                    elif self._count:
+                        raise ValueError("Trailing comma in JSON array")
+                    self._item_start = None
+                    self._finished = True
+            elif character == b"," and self._depth == 1:
+                item = bytes(buffer[self._item_start : match.start()]).strip(_WHITESPACE)
+                if not item:
+                    raise ValueError("Empty item in JSON array")
+                items.append(item)
+                self._count += 1
+                self._item_start = self._position
+
+        self._compact()
+        if self.max_item_bytes is not None:
+            sizes = [len(item) for item in items]
+            if self._item_start is not None:
+                sizes.append(len(self._buffer) - self._item_start)
+            if max(sizes, default=0) > self.max_item_bytes:
+                raise ItemTooLargeError(f"Item larger than {self.max_item_bytes} bytes")
+        return items
+
+    def close(self) -> None:
+        """Check that the body ended with the end of the array.
+
+        Raises:
+            ValueError: If the array is incomplete
+        """
+        if not self._finished or self._item_start is not None:
+            raise ValueError("Truncated JSON array")
+
+    def _compact(self) -> None:
+        """Drop the bytes of the items already returned."""
+        keep_from = self._item_start if self._item_start is not None else self._position
+        if keep_from:
+            del self._buffer[:keep_from]
+            self._position -= keep_from
+            if self._item_start is not None:
+                self._item_start -= keep_from
@@ -0,0 +1,48 @@
+"""Compare the cost of rendering a large document response with the standard library and orjson.
+
+The API renders its responses with `fastapi.responses.ORJSONResponse`; this microbenchmark
+shows what it saves over FastAPI's default `JSONResponse` for large `analysis` payloads.
+
+Usage looks like:
+
+    python -m backend.utils.response_benchmark
+"""
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from backend.schemas.document import DocumentResponse
+
+
+def main(number: int = 20) -> None:
+    analysis = {
+        "entities": [
+            {"text": f"Entity {i}", "type": "ORG", "start": i * 10, "end": i * 10 + 8, "score": 0.87}
+            for i in range(20_000)
+        ],
+        "questions": [f"What is the role of entity {i} in the document?" for i in range(2_000)],
+        "sections": {f"section-{i}": {"summary": "lorem ipsum " * 40, "tokens": 512} for i in range(500)},
+    }
+    document = DocumentResponse(summary="lorem ipsum " * 500, analysis=analysis, status="completed")
+    payload = document.model_dump(mode="json")
+
+    candidates = {
+        "jsonable_encoder + json.dumps (FastAPI default, pydantic v1 path)": lambda: JSONResponse(
+            jsonable_encoder(document)
+        ).body,
+        "pydantic-core dump + json.dumps (FastAPI default, pydantic v2 path)": lambda: JSONResponse(
+            document.model_dump(mode="json")
+        ).body,
+        "pydantic-core dump + orjson (ORJSONResponse)": lambda: ORJSONResponse(document.model_dump(mode="json")).body,
+        "render only: json.dumps": lambda: JSONResponse(payload).body,
+        "render only: orjson": lambda: ORJSONResponse(payload).body,
+    }
+    print(f"Payload: {len(ORJSONResponse(payload).body) / 1024:.0f} KiB")
+    for name, candidate in candidates.items():
+        seconds = min(timeit.repeat(candidate, number=number, repeat=3)) / number
+        print(f"{name:<70} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import asyncio
+import codecs
+import fcntl
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterable, BinaryIO, Callable, Iterator, Optional, TypeVar
+
+LOCK_NAME = ".lock"
+
+T = TypeVar("T")
+
+
+class UploadTooLargeError(Exception):
+    """Raised when a spooled upload exceeds its size limit."""
+
+
+@dataclass
+class SpooledFile:
+    """A document spooled to disk.
+
+    Attributes:
+        path: Location of the spooled file, under a temporary name until `store_spooled`
+        sha256: Hex SHA-256 digest of the content
+        size: Size of the content in bytes
+    """
+    path: Path
+    sha256: str
+    size: int
+
+
+async def spool_stream(chunks: AsyncIterable[bytes], directory: Path, max_bytes: int) -> SpooledFile:
+    """Write a byte stream to disk chunk by chunk, hashing it on the fly.
+
+    Only one chunk is held in memory at a time. Disk writes and hashing run in a worker thread,
+    so the event loop never blocks on the filesystem. The file is left under a temporary name,
+    for `store_spooled` to move it in place once the document referencing it is stored.
+
+    Args:
+        chunks: The byte stream, e.g. `Request.stream()`
+        directory: Directory receiving the spooled files
+        max_bytes: Maximum accepted size
+
+    Returns:
+        SpooledFile: The spooled file
+
+    Raises:
+        UploadTooLargeError: If the stream is larger than `max_bytes`
+    """
+    fd, partial_path = await asyncio.to_thread(_make_partial, directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        file = os.fdopen(fd, "wb")
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                await asyncio.to_thread(_write_chunk, file, digest, chunk)
+        finally:
+            await asyncio.to_thread(file.close)
+    except BaseException:
+        await asyncio.shield(asyncio.to_thread(Path(partial_path).unlink, missing_ok=True))
+        raise
+    return SpooledFile(path=Path(partial_path), sha256=digest.hexdigest(), size=size)
+
+
+def _make_partial(directory: Path) -> tuple[int, str]:
+    directory.mkdir(parents=True, exist_ok=True)
+    return tempfile.mkstemp(dir=directory, suffix=".part")
+
+
+def _write_chunk(file: BinaryIO, digest: "hashlib._Hash", chunk: bytes) -> None:
+    digest.update(chunk)
+    file.write(chunk)
+
+
+@contextmanager
+def spool_lock(directory: Path) -> Iterator[None]:
+    """Exclusive lock over the spooled files of a directory, across processes.
+
+    The API and the workers must share the directory, on a filesystem supporting `flock`. The
+    lock blocks, so async callers must take it from a worker thread (e.g. `run_in_threadpool`).
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / LOCK_NAME, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def store_spooled(
+    spooled: SpooledFile, store: Callable[[Path], Optional[T]], references: Callable[[], Optional[int]]
+) -> Optional[T]:
+    """Move a spooled file in place under its digest and store the document referencing it.
+
+    Identical uploads share a single file, which readers never see partially written. The move
+    and `store` run under `spool_lock`, so `release_spooled` cannot remove the file in between.
+    When `store` fails, the file is released.
+
+    Args:
+        spooled: The file returned by `spool_stream`
+        store: Stores the document referencing the given path, returns None on failure
+        references: Counts the unprocessed documents referencing the file
+
+    Returns:
+        The result of `store`
+    """
+    path = spooled.path.with_name(spooled.sha256)
+    with spool_lock(path.parent):
+        try:
+            os.replace(spooled.path, path)
+            stored = store(path)
+        except BaseException:
+            spooled.path.unlink(missing_ok=True)
+            _remove_unreferenced(path, references)
+            raise
+        if stored is None:
+            _remove_unreferenced(path, references)
+    return stored
+
+
+def release_spooled(path: Path, references: Callable[[], Optional[int]]) -> bool:
+    """Remove a spooled file once no unprocessed document references it.
+
+    Documents with identical content share their file, so it is reference counted: `references`
+    is called under `spool_lock`, and the file is only removed when it returns 0.
+
+    Args:
+        path: The spooled file
+        references: Counts the unprocessed documents referencing the file, None if unknown
+
+    Returns:
+        bool: Whether the file was removed
+    """
+    with spool_lock(path.parent):
+        return _remove_unreferenced(path, references)
+
+
+def _remove_unreferenced(path: Path, references: Callable[[], Optional[int]]) -> bool:
+    if references() != 0:
+        return False
+    path.unlink(missing_ok=True)
+    return True
+
+
+def iter_text_chunks(path: Path, chunk_size: int = 1024 * 1024, encoding: str = "utf-8") -> Iterator[str]:
+    """Decode a spooled file incrementally through a memory map.
+
+    Multi-byte characters split across chunk boundaries are handled by an incremental decoder,
+    and undecodable bytes are replaced.
+
+    Args:
+        path: The spooled file
+        chunk_size: Number of bytes decoded per chunk
+        encoding: Text encoding of the file
+
+    Yields:
+        str: Consecutive pieces of the decoded text
+    """
+    if os.path.getsize(path) == 0:
+        return
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for offset in range(0, len(mapped), chunk_size):
+            text = decoder.decode(mapped[offset : offset + chunk_size])
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import setup_logging
 import os
 
 # Configure Celery
@@ -6,7 +7,7 @@ celery_app = Celery(
     "seraphy",
     broker=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
     backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-    include=["workers.tasks"]
+    include=["backend.workers.tasks"]
 )
 
 # Optional configuration
@@ -21,5 +22,15 @@ celery_app.conf.update(
     task_acks_late=True,
 )
 
+
+
+@setup_logging.connect
+def _configure_worker_logging(**kwargs):
+    """Use the project logging configuration instead of Celery's."""
+    from backend import configure_logging
+
+    configure_logging()
+
+
 if __name__ == "__main__":
     celery_app.start()
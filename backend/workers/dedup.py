@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from backend.workers.events import get_client
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY = "idempotency:{owner}:{key}"
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+# Until its document is stored, so that a request dying in between does not hold the key for a day
+IDEMPOTENCY_PENDING_TTL_SECONDS = 60
+INFLIGHT_KEY = "documents:inflight:{fingerprint}"
+FOLLOWERS_KEY = "documents:inflight:{fingerprint}:followers"
+# Upper bound on a job's duration: past it, a crashed leader no longer captures new submissions
+INFLIGHT_TTL_SECONDS = 60 * 60
+
+# KEYS: inflight, followers. ARGV: document id, ttl. Returns the leader id when joining, nil when leading.
+_JOIN_OR_LEAD = """
+local leader = redis.call('GET', KEYS[1])
+if leader then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+    return leader
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return nil
+"""
+
+# KEYS: inflight, followers. ARGV: leader id. Returns the followers, releasing the flight if still led by ARGV[1].
+_RESOLVE = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return {}
+end
+local followers = redis.call('LRANGE', KEYS[2], 0, -1)
+redis.call('DEL', KEYS[1], KEYS[2])
+return followers
+"""
+
+
+@dataclass
+class IdempotencyClaim:
+    """Document created for an idempotency key.
+
+    Attributes:
+        document_id: Id of the document created by the first request with the key
+        fingerprint: Fingerprint of that request's content and options
+    """
+    document_id: str
+    fingerprint: str
+
+
+def document_fingerprint(content_sha256: str, options: dict[str, Any]) -> str:
+    """Identify a submission by its content digest and processing options."""
+    canonical_options = json.dumps(options, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{content_sha256}:{canonical_options}".encode()).hexdigest()
+
+
+def claim_idempotency_key(owner: str, key: str, document_id: str, fingerprint: str) -> Optional[IdempotencyClaim]:
+    """Bind an idempotency key to a new document, unless a previous request already did.
+
+    Keys are scoped to their owner. A new claim expires after `IDEMPOTENCY_PENDING_TTL_SECONDS`,
+    extended to `IDEMPOTENCY_TTL_SECONDS` by `confirm_idempotency_key` once its document is
+    stored and queued. When Redis is unavailable the key is ignored, so submissions keep
+    working without the guarantee.
+
+    Args:
+        owner: Username of the caller
+        key: Value of the `Idempotency-Key` header
+        document_id: Id of the document the current request is about to create
+        fingerprint: Fingerprint of the current request, see `document_fingerprint`
+
+    Returns:
+        Optional[IdempotencyClaim]: The existing claim if the key was already used, None if it is now
+        bound to `document_id`
+    """
+    redis_key = IDEMPOTENCY_KEY.format(owner=owner, key=key)
+    claim = json.dumps({"document_id": document_id, "fingerprint": fingerprint})
+    try:
+        client = get_client()
+        if client.set(redis_key, claim, nx=True, ex=IDEMPOTENCY_PENDING_TTL_SECONDS):
+            return None
+        existing = client.get(redis_key)
+    except Exception as e:
+        logger.warning(f"Could not claim idempotency key for {owner}: {e}")
+        return None
+    if existing is None:
+        # Expired between SET and GET, the key is free again
+        return claim_idempotency_key(owner, key, document_id, fingerprint)
+    return IdempotencyClaim(**json.loads(existing))
+
+
+def confirm_idempotency_key(owner: str, key: str, document_id: str, fingerprint: str) -> None:
+    """Keep a claimed idempotency key for `IDEMPOTENCY_TTL_SECONDS` now that its document exists."""
+    claim = json.dumps({"document_id": document_id, "fingerprint": fingerprint})
+    try:
+        get_client().set(IDEMPOTENCY_KEY.format(owner=owner, key=key), claim, ex=IDEMPOTENCY_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not confirm idempotency key for {owner}: {e}")
+
+
+def release_idempotency_key(owner: str, key: str) -> None:
+    """Forget an idempotency key whose request failed to store or queue its document."""
+    try:
+        get_client().delete(IDEMPOTENCY_KEY.format(owner=owner, key=key))
+    except Exception as e:
+        logger.warning(f"Could not release idempotency key for {owner}: {e}")
+
+
+def join_or_lead(fingerprint: str, document_id: str) -> Optional[str]:
+    """Attach a document to an in-flight job with the same fingerprint, or make it the leader.
+
+    Only the leader is queued for processing. Followers are resolved by the leader's worker
+    with `resolve_followers` once it is done, and receive the same result. Registration and
+    resolution are atomic, so a follower either joins before the leader resolves or becomes
+    the leader of a new flight. When Redis is unavailable every document leads its own job.
+
+    Args:
+        fingerprint: Fingerprint of the submission, see `document_fingerprint`
+        document_id: Id of the submitted document
+
+    Returns:
+        Optional[str]: Id of the leader document if one is in flight, None if `document_id` leads
+    """
+    keys = [INFLIGHT_KEY.format(fingerprint=fingerprint), FOLLOWERS_KEY.format(fingerprint=fingerprint)]
+    try:
+        return get_client().eval(_JOIN_OR_LEAD, len(keys), *keys, document_id, INFLIGHT_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not coalesce document {document_id}: {e}", extra={"document_id": document_id})
+        return None
+
+
+def resolve_followers(fingerprint: str, leader_id: str) -> list[str]:
+    """End a flight and return the documents waiting on its result.
+
+    Args:
+        fingerprint: Fingerprint of the submission, see `document_fingerprint`
+        leader_id: Id of the leader document
+
+    Returns:
+        list[str]: Ids of the follower documents, empty if `leader_id` no longer leads the flight
+    """
+    keys = [INFLIGHT_KEY.format(fingerprint=fingerprint), FOLLOWERS_KEY.format(fingerprint=fingerprint)]
+    try:
+        return get_client().eval(_RESOLVE, len(keys), *keys, leader_id)
+    except Exception as e:
+        logger.error(f"Could not resolve followers of document {leader_id}: {e}", extra={"document_id": leader_id})
+        return []
@@ -0,0 +1,122 @@
+import json
+import logging
+from enum import Enum
+from typing import Any, AsyncIterator, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from backend import PROJECT_ENVS
+
+logger = logging.getLogger(__name__)
+
+EVENTS_KEY = "documents:{document_id}:events"
+EVENTS_MAX_LEN = 1_000
+EVENTS_TTL_SECONDS = 24 * 60 * 60
+
+_client: Optional[redis.Redis] = None
+
+
+class DocumentEvent(Enum):
+    QUEUED = "queued"
+    STARTED = "started"
+    STAGE_COMPLETED = "stage_completed"
+    SUMMARY_TOKENS = "summary_tokens"
+    DONE = "done"
+    FAILED = "failed"
+
+
+TERMINAL_EVENTS = {DocumentEvent.DONE.value, DocumentEvent.FAILED.value}
+
+
+def get_client() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(PROJECT_ENVS.REDIS_URL, decode_responses=True)
+    return _client
+
+
+def close_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def publish_event(document_id: str, event: DocumentEvent, data: Optional[dict[str, Any]] = None) -> Optional[str]:
+    """Append a progress event to the document's Redis stream.
+
+    Events are stored in a capped stream rather than sent over pub/sub so that a client
+    reconnecting with `Last-Event-ID` can resume from where it stopped. Publishing never
+    raises: progress reporting must not fail the processing itself.
+
+    Args:
+        document_id: Id of the document the event belongs to
+        event: The event type
+        data: JSON-serializable event payload
+
+    Returns:
+        The stream entry id, used as SSE event id, or None if the event could not be published
+    """
+    key = EVENTS_KEY.format(document_id=document_id)
+    try:
+        pipeline = get_client().pipeline()
+        pipeline.xadd(key, {"event": event.value, "data": json.dumps(data or {})}, maxlen=EVENTS_MAX_LEN)
+        pipeline.expire(key, EVENTS_TTL_SECONDS)
+        entry_id, _ = pipeline.execute()
+        return entry_id
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish {event.value} event for document {document_id}: {e}")
+        return None
+
+
+def publish_events(document_ids: list[str], event: DocumentEvent, data: Optional[dict[str, Any]] = None) -> None:
+    """Append the same progress event to the streams of many documents, in a single round trip.
+
+    Like `publish_event`, never raises.
+    """
+    if not document_ids:
+        return
+    fields = {"event": event.value, "data": json.dumps(data or {})}
+    try:
+        pipeline = get_client().pipeline(transaction=False)
+        for document_id in document_ids:
+            key = EVENTS_KEY.format(document_id=document_id)
+            pipeline.xadd(key, fields, maxlen=EVENTS_MAX_LEN)
+            pipeline.expire(key, EVENTS_TTL_SECONDS)
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish {event.value} events for {len(document_ids)} documents: {e}")
+
+
+async def read_events(
+    document_id: str, last_event_id: Optional[str] = None, block_ms: int = 15_000
+) -> AsyncIterator[Optional[tuple[str, str, str]]]:
+    """Follow the document's event stream, starting after `last_event_id`.
+
+    Args:
+        document_id: Id of the document to follow
+        last_event_id: Id of the last event the client received. None replays the stream from the start
+        block_ms: Maximum time to wait for new events before yielding a heartbeat
+
+    Yields:
+        (event id, event type, JSON data) tuples, or None when no event arrived within `block_ms`.
+        The iteration stops after a terminal event.
+    """
+    key = EVENTS_KEY.format(document_id=document_id)
+    cursor = last_event_id or "0"
+    # A blocking XREAD holds its connection for the whole wait, so each follower gets its own
+    client = aioredis.Redis.from_url(PROJECT_ENVS.REDIS_URL, decode_responses=True)
+    try:
+        while True:
+            response = await client.xread({key: cursor}, count=100, block=block_ms)
+            if not response:
+                yield None
+                continue
+            for entry_id, fields in response[0][1]:
+                cursor = entry_id
+                yield entry_id, fields["event"], fields["data"]
+                if fields["event"] in TERMINAL_EVENTS:
+                    return
+    finally:
+        await client.close()
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from backend import PROJECT_ENVS
+from backend.workers.events import get_client
+
+logger = logging.getLogger(__name__)
+
+# Bump when prompts or post-processing change, to stop serving results of the previous pipeline
+RESULT_STORE_VERSION = 1
+RESULT_KEY = "results:{digest}"
+INDEX_KEY = "results:index"
+SIZES_KEY = "results:sizes"
+TOTAL_BYTES_KEY = "results:bytes"
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+_TRAILING_SPACES = re.compile(r"[ \t]+\n")
+
+# KEYS: entry, index, sizes, total. ARGV: value, ttl, now, max bytes.
+# Drops index entries past their TTL, then evicts least recently used entries until under budget.
+_STORE = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[3] - ARGV[2])
+for _, key in ipairs(expired) do
+    local size = redis.call('HGET', KEYS[3], key)
+    if size then
+        redis.call('DECRBY', KEYS[4], size)
+        redis.call('HDEL', KEYS[3], key)
+    end
+    redis.call('ZREM', KEYS[2], key)
+end
+
+local previous = redis.call('HGET', KEYS[3], KEYS[1])
+if previous then
+    redis.call('DECRBY', KEYS[4], previous)
+end
+local size = string.len(ARGV[1])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('HSET', KEYS[3], KEYS[1], size)
+redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+redis.call('INCRBY', KEYS[4], size)
+
+local evicted = 0
+while tonumber(redis.call('GET', KEYS[4])) > tonumber(ARGV[4]) do
+    local oldest = redis.call('ZPOPMIN', KEYS[2])
+    if #oldest == 0 then
+        break
+    end
+    local oldest_size = redis.call('HGET', KEYS[3], oldest[1])
+    if oldest_size then
+        redis.call('DECRBY', KEYS[4], oldest_size)
+        redis.call('HDEL', KEYS[3], oldest[1])
+    end
+    redis.call('DEL', oldest[1])
+    evicted = evicted + 1
+end
+return evicted
+"""
+
+
+@dataclass
+class StoredResult:
+    """Processing result shared by every document with the same content and options.
+
+    Attributes:
+        summary: The document summary
+        analysis: The document analysis
+    """
+    summary: Optional[str]
+    analysis: Optional[dict[str, Any]]
+
+
+def normalize_content(content: str) -> str:
+    """Normalize the formatting differences that do not change what a document says.
+
+    Unicode is NFC-normalized, line endings unified, trailing spaces removed, runs of blank
+    lines collapsed and the document stripped.
+    """
+    content = unicodedata.normalize("NFC", content).replace("\r\n", "\n").replace("\r", "\n")
+    content = _TRAILING_SPACES.sub("\n", content + "\n")
+    return _BLANK_LINES.sub("\n\n", content).strip()
+
+
+def result_key(content: str, options: dict[str, Any]) -> str:
+    """Redis key of the result for a document content, its processing options and the current model."""
+    return result_key_for_digest(hashlib.sha256(normalize_content(content).encode()).hexdigest(), options)
+
+
+def result_key_for_digest(content_digest: str, options: dict[str, Any]) -> str:
+    """Redis key of the result for a content digest, e.g. of a spooled upload that is not read whole.
+
+    Spooled contents are keyed by the digest of their bytes, not normalized, so they only share
+    results with identical uploads.
+    """
+    canonical_options = json.dumps(options, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(
+        f"{content_digest}:{canonical_options}:{PROJECT_ENVS.DOCUMENT_MODEL}:{RESULT_STORE_VERSION}".encode()
+    ).hexdigest()
+    return RESULT_KEY.format(digest=digest)
+
+
+def lookup_result(key: str, ttl: int = PROJECT_ENVS.RESULT_STORE_TTL_SECONDS) -> Optional[StoredResult]:
+    """Read a stored result and mark it as recently used.
+
+    The key expiry is refreshed together with its recency score, so an entry the index still
+    counts as live cannot expire under it.
+
+    Args:
+        key: Key of the result, see `result_key`
+        ttl: Seconds before the result expires, from now
+
+    Returns:
+        Optional[StoredResult]: The result, or None on a miss or when Redis is unavailable
+    """
+    try:
+        client = get_client()
+        value = client.getex(key, ex=ttl)
+        if value is None:
+            return None
+        client.zadd(INDEX_KEY, {key: time.time()}, xx=True)
+    except Exception as e:
+        logger.warning(f"Could not read result store: {e}")
+        return None
+    return StoredResult(**json.loads(value))
+
+
+def store_result(
+    key: str,
+    result: StoredResult,
+    ttl: int = PROJECT_ENVS.RESULT_STORE_TTL_SECONDS,
+    max_bytes: int = PROJECT_ENVS.RESULT_STORE_MAX_BYTES,
+) -> None:
+    """Store a result, evicting the least recently used ones beyond `max_bytes`.
+
+    The store keeps its own accounting (a recency index and entry sizes) instead of relying
+    on the Redis `maxmemory` policy, so it can share an instance with the broker and the
+    event streams without any of them being evicted.
+
+    Args:
+        key: Key of the result, see `result_key`
+        result: The result to store
+        ttl: Seconds before the result expires
+        max_bytes: Total size of the stored results above which the oldest ones are evicted
+    """
+    value = json.dumps({"summary": result.summary, "analysis": result.analysis})
+    keys = [key, INDEX_KEY, SIZES_KEY, TOTAL_BYTES_KEY]
+    try:
+        evicted = get_client().eval(_STORE, len(keys), *keys, value, ttl, time.time(), max_bytes)
+    except Exception as e:
+        logger.warning(f"Could not write result store: {e}")
+        return
+    if evicted:
+        logger.info(f"Evicted {evicted} results from the result store")
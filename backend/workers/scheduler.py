@@ -0,0 +1,271 @@
+import logging
+import time
+from typing import Optional
+
+from backend import PROJECT_ENVS
+from backend.workers.events import get_client
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY_PREFIX = "scheduler:queue:"
+RING_KEY = "scheduler:ring"
+OWNERS_KEY = "scheduler:owners"
+DEFICITS_KEY = "scheduler:deficits"
+RUNNING_KEY = "scheduler:running"
+LEASES_KEY = "scheduler:leases"
+LEASE_OWNERS_KEY = "scheduler:lease_owners"
+WEIGHTS_KEY = "scheduler:weights"
+CAPS_KEY = "scheduler:caps"
+PENDING_KEY = "scheduler:pending"
+# Bounds the number of turns an owner may need to earn a job
+MIN_WEIGHT = 0.01
+
+# KEYS: queue, ring, owners, pending. ARGV: owner, document ids. Returns the owner's backlog.
+_SUBMIT = """
+local length = redis.call('RPUSH', KEYS[1], unpack(ARGV, 2))
+redis.call('INCRBY', KEYS[4], #ARGV - 1)
+if redis.call('SADD', KEYS[3], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+return length
+"""
+
+# KEYS: ring, owners, deficits, running, leases, lease owners, weights, caps, pending.
+# ARGV: now, lease seconds, max dispatched, default cap per owner, queue key prefix.
+# Returns the dispatched jobs as a flat list of owner, document id pairs.
+_DISPATCH = """
+local now = tonumber(ARGV[1])
+local function release(document_id)
+    local owner = redis.call('HGET', KEYS[6], document_id)
+    redis.call('HDEL', KEYS[6], document_id)
+    if owner and redis.call('HINCRBY', KEYS[4], owner, -1) <= 0 then
+        redis.call('HDEL', KEYS[4], owner)
+    end
+end
+local function retire(owner)
+    redis.call('SREM', KEYS[2], owner)
+    redis.call('HDEL', KEYS[3], owner)
+end
+
+for _, document_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[5], '-inf', now)) do
+    redis.call('ZREM', KEYS[5], document_id)
+    release(document_id)
+end
+
+local dispatched = {}
+local total = redis.call('ZCARD', KEYS[5])
+local owners = redis.call('LLEN', KEYS[1])
+local idle = 0
+while total < tonumber(ARGV[3]) and owners > 0 and idle < owners do
+    local owner = redis.call('LPOP', KEYS[1])
+    local queue = ARGV[5] .. owner
+    local running = tonumber(redis.call('HGET', KEYS[4], owner) or '0')
+    local cap = tonumber(redis.call('HGET', KEYS[8], owner) or ARGV[4])
+    local capped = running >= cap
+    if not capped then
+        local deficit = tonumber(redis.call('HGET', KEYS[3], owner) or '0')
+        deficit = deficit + tonumber(redis.call('HGET', KEYS[7], owner) or '1')
+        while deficit >= 1 and running < cap and total < tonumber(ARGV[3]) do
+            local document_id = redis.call('LPOP', queue)
+            if not document_id then
+                break
+            end
+            redis.call('ZADD', KEYS[5], now + tonumber(ARGV[2]), document_id)
+            redis.call('HSET', KEYS[6], document_id, owner)
+            redis.call('HINCRBY', KEYS[4], owner, 1)
+            redis.call('DECR', KEYS[9])
+            table.insert(dispatched, owner)
+            table.insert(dispatched, document_id)
+            running = running + 1
+            total = total + 1
+            deficit = deficit - 1
+        end
+        redis.call('HSET', KEYS[3], owner, deficit)
+    end
+    if redis.call('LLEN', queue) == 0 then
+        retire(owner)
+        owners = owners - 1
+    else
+        redis.call('RPUSH', KEYS[1], owner)
+    end
+    -- Owners short of credit get more on their next turn, only capped owners can stall a round
+    if capped then
+        idle = idle + 1
+    else
+        idle = 0
+    end
+end
+return dispatched
+"""
+
+# KEYS: leases, lease owners, running. ARGV: document id. Returns 1 if the document held a lease.
+_RELEASE = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+local owner = redis.call('HGET', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+if owner and redis.call('HINCRBY', KEYS[3], owner, -1) <= 0 then
+    redis.call('HDEL', KEYS[3], owner)
+end
+return 1
+"""
+
+# KEYS: queue, ring, owners, pending. ARGV: owner, document id. Puts a job back at the head of its owner's queue.
+_REQUEUE = """
+redis.call('LPUSH', KEYS[1], ARGV[2])
+redis.call('INCR', KEYS[4])
+if redis.call('SADD', KEYS[3], ARGV[1]) == 1 then
+    redis.call('LPUSH', KEYS[2], ARGV[1])
+end
+"""
+
+
+def schedule_documents(owner: str, document_ids: list[str]) -> None:
+    """Queue documents for processing behind the fair-share scheduler.
+
+    Each owner has its own queue. Jobs are handed to the Celery workers by `dispatch_jobs`
+    only as capacity frees up, so the broker queue stays short and a heavy owner's backlog
+    waits in its own queue instead of in front of everyone else's jobs. When Redis is
+    unavailable for the scheduler, the documents are sent to Celery directly.
+
+    Args:
+        owner: Username of the owner of the documents
+        document_ids: Ids of the stored documents, processed in this order
+
+    Raises:
+        Exception: If the documents can neither be scheduled nor sent to Celery
+    """
+    if not document_ids:
+        return
+    keys = [QUEUE_KEY_PREFIX + owner, RING_KEY, OWNERS_KEY, PENDING_KEY]
+    try:
+        get_client().eval(_SUBMIT, len(keys), *keys, owner, *document_ids)
+    except Exception as e:
+        logger.warning(f"Could not schedule documents of {owner}, queuing them directly: {e}")
+        _send(document_ids)
+        return
+    dispatch_jobs()
+
+
+def dispatch_jobs(
+    max_dispatched: int = PROJECT_ENVS.SCHEDULER_MAX_DISPATCHED,
+    max_running_per_owner: int = PROJECT_ENVS.SCHEDULER_MAX_RUNNING_PER_OWNER,
+    lease_seconds: int = PROJECT_ENVS.SCHEDULER_LEASE_SECONDS,
+) -> int:
+    """Hand queued jobs to the Celery workers, fairly across owners.
+
+    Owners are served by deficit round-robin: each turn credits an owner with its weight
+    (1 unless set with `set_owner_limits`) and dispatches one job per whole credit, so
+    owners get worker time in proportion to their weight whatever their backlog, and a
+    light owner's job waits at most one round. An owner never has more than its cap of
+    jobs dispatched at once, and the workers never more than `max_dispatched`.
+
+    Dispatched jobs hold a lease until `release_job`. Leases of jobs lost with their worker
+    expire after `lease_seconds`. Called whenever jobs are submitted or completed, so no
+    separate scheduler process is needed.
+
+    Args:
+        max_dispatched: Maximum number of jobs dispatched and not yet released, about the
+            total concurrency of the workers
+        max_running_per_owner: Default maximum number of jobs dispatched per owner
+        lease_seconds: Upper bound on a job's duration
+
+    Returns:
+        int: Number of jobs dispatched
+    """
+    keys = [
+        RING_KEY,
+        OWNERS_KEY,
+        DEFICITS_KEY,
+        RUNNING_KEY,
+        LEASES_KEY,
+        LEASE_OWNERS_KEY,
+        WEIGHTS_KEY,
+        CAPS_KEY,
+        PENDING_KEY,
+    ]
+    try:
+        dispatched = get_client().eval(
+            _DISPATCH,
+            len(keys),
+            *keys,
+            time.time(),
+            lease_seconds,
+            max_dispatched,
+            max_running_per_owner,
+            QUEUE_KEY_PREFIX,
+        )
+    except Exception as e:
+        logger.warning(f"Could not dispatch scheduled jobs: {e}")
+        return 0
+
+    jobs = list(zip(dispatched[::2], dispatched[1::2]))
+    for index, (_, document_id) in enumerate(jobs):
+        try:
+            _send([document_id])
+        except Exception as e:
+            logger.error(f"Could not queue scheduled documents: {e}")
+            for owner, unsent_id in reversed(jobs[index:]):
+                _requeue(owner, unsent_id)
+            return index
+    return len(jobs)
+
+
+def release_job(document_id: str) -> None:
+    """Free the capacity held by a dispatched job once it is processed, and dispatch the next ones."""
+    keys = [LEASES_KEY, LEASE_OWNERS_KEY, RUNNING_KEY]
+    try:
+        get_client().eval(_RELEASE, len(keys), *keys, document_id)
+    except Exception as e:
+        logger.warning(f"Could not release scheduled job {document_id}: {e}", extra={"document_id": document_id})
+        return
+    dispatch_jobs()
+
+
+def set_owner_limits(owner: str, weight: Optional[float] = None, max_running: Optional[int] = None) -> None:
+    """Set the share of an owner, e.g. per plan. None restores the default.
+
+    Args:
+        owner: Username of the owner
+        weight: Jobs dispatched per round relative to other owners, may be fractional
+        max_running: Maximum number of jobs dispatched at once for the owner
+
+    Raises:
+        ValueError: If the weight is below `MIN_WEIGHT` or the cap below 1
+    """
+    if weight is not None and weight < MIN_WEIGHT:
+        raise ValueError(f"Owner weight must be at least {MIN_WEIGHT}")
+    if max_running is not None and max_running < 1:
+        raise ValueError("Owners must be allowed at least one running job")
+    pipeline = get_client().pipeline()
+    for key, value in ((WEIGHTS_KEY, weight), (CAPS_KEY, max_running)):
+        if value is None:
+            pipeline.hdel(key, owner)
+        else:
+            pipeline.hset(key, owner, value)
+    pipeline.execute()
+
+
+def pending_jobs() -> int:
+    """Number of jobs waiting in the scheduler queues."""
+    return int(get_client().get(PENDING_KEY) or 0)
+
+
+def _requeue(owner: str, document_id: str) -> None:
+    keys = [QUEUE_KEY_PREFIX + owner, RING_KEY, OWNERS_KEY, PENDING_KEY]
+    try:
+        pipeline = get_client().pipeline()
+        pipeline.eval(_RELEASE, 3, LEASES_KEY, LEASE_OWNERS_KEY, RUNNING_KEY, document_id)
+        pipeline.eval(_REQUEUE, len(keys), *keys, owner, document_id)
+        pipeline.execute()
+    except Exception as e:
+        logger.error(f"Could not requeue document {document_id}: {e}", extra={"document_id": document_id})
+
+
+def _send(document_ids: list[str]) -> None:
+    # Imported here as the tasks module imports this one
+    from backend.workers.tasks import process_document_task
+
+    for document_id in document_ids:
+        process_document_task.delay(document_id)
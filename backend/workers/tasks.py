@@ -1,37 +1,159 @@
-from workers.celery_app import celery_app
-from core.processor import process_document
-from schemas.document import ProcessingOptions
+from backend import PROJECT_PATHS
+from backend.constants import DocumentStatus
+from backend.db import session_maker
+from backend.repository.document import DocumentRepository
+from backend.schemas.document import ProcessingOptions
+from backend.utils.spool import iter_text_chunks, release_spooled
+from backend.workers.dedup import document_fingerprint, resolve_followers
+from backend.workers.events import DocumentEvent, publish_event
+from backend.workers.results import StoredResult, lookup_result, result_key, result_key_for_digest, store_result
+from backend.workers.scheduler import release_job
+from backend.workers.celery_app import celery_app
+from celery.signals import task_postrun, worker_process_init
+import asyncio
 import logging
+from pathlib import Path
+from typing import Any, Coroutine, Optional
 
 logger = logging.getLogger(__name__)
 
+# One event loop per worker process, so that the pooled model API connections outlive a task
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _run_async(coroutine: Coroutine) -> Any:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coroutine)
+
+
 @celery_app.task(bind=True, name="process_document_task")
-def process_document_task(self, content: str, options_dict: dict):
+def process_document_task(self, document_id: str):
     """
-    Celery task to process documents asynchronously
+    Celery task to process a stored document asynchronously
+    
+    The document content and options are read from the `documents` table (or, for
+    streamed uploads, from the spooled file it references, chunked as it is read and
+    removed once no unprocessed document references it), so the broker message
+    only carries the id. Status and results are written back to the
+    same row for GET /documents/{id}, to the content-addressed result store
+    consulted before processing, and to the identical submissions coalesced onto
+    this one while it was in flight.
     
     Args:
-        content: Document content to process
-        options_dict: Dictionary of processing options
+        document_id: Id of the document row to process
     
     Returns:
         Dictionary with processing results
     """
+    # Imported here so that the API, which only queues this task, does not load the model SDKs
+    from backend.core.processor import process_document
+
+    with session_maker.context_session() as session:
+        repository = DocumentRepository(session)
+        record = repository.read(document_id)
+        if record is None:
+            logger.warning(f"Document {document_id} not found, skipping", extra={"document_id": document_id})
+            return None
+
+        fingerprint = (
+            document_fingerprint(record.content_sha256, record.options) if record.content_sha256 is not None else None
+        )
+        repository.update(document_id, {"status": DocumentStatus.STARTED.value}, fields=["status"])
+        publish_event(document_id, DocumentEvent.STARTED)
+        try:
+            # Convert dict to ProcessingOptions
+            options = ProcessingOptions(**record.options)
+            
+            if record.content_path is None:
+                content = record.content
+                key = result_key(content, record.options)
+            else:
+                # Chunked as it is read, the file is never decoded whole
+                content = iter_text_chunks(Path(record.content_path))
+                key = result_key_for_digest(record.content_sha256, record.options)
+            result = lookup_result(key)
+            timings = None
+            if result is None:
+                result = _run_async(
+                    process_document(
+                        content,
+                        options,
+                        on_stage=lambda stage, data: publish_event(
+                            document_id, DocumentEvent.STAGE_COMPLETED, {"stage": stage, **data}
+                        ),
+                        on_summary_delta=lambda delta: publish_event(
+                            document_id, DocumentEvent.SUMMARY_TOKENS, {"delta": delta}
+                        ),
+                    )
+                )
+                store_result(key, StoredResult(summary=result.summary, analysis=result.analysis))
+                timings = result.timings
+            else:
+                logger.info(f"Reused stored result for document {document_id}", extra={"document_id": document_id})
+
+            completed = {
+                "status": DocumentStatus.COMPLETED.value,
+                "summary": result.summary,
+                "analysis": result.analysis,
+                "timings": timings,
+            }
+            repository.update(document_id, completed)
+            publish_event(document_id, DocumentEvent.DONE, {"summary": result.summary, "analysis": result.analysis})
+            _share_with_followers(repository, fingerprint, document_id, completed, DocumentEvent.DONE)
+            return {
+                "id": document_id,
+                "summary": result.summary,
+                "analysis": result.analysis,
+                "status": DocumentStatus.COMPLETED.value
+            }
+        except Exception as e:
+            logger.error(f"Error processing document: {str(e)}", extra={"document_id": document_id})
+            failed = {"status": DocumentStatus.FAILED.value, "error": str(e)}
+            repository.update(document_id, failed)
+            publish_event(document_id, DocumentEvent.FAILED, {"error": str(e)})
+            _share_with_followers(repository, fingerprint, document_id, failed, DocumentEvent.FAILED)
+            self.update_state(state="FAILURE", meta={"error": str(e)})
+            raise
+        finally:
+            # Checked even for inline documents, as spooled uploads of the same content may be coalesced onto them
+            spooled_path = PROJECT_PATHS.UPLOADS_DATA / record.content_sha256 if record.content_sha256 else None
+            if spooled_path is not None and spooled_path.exists():
+                release_spooled(spooled_path, lambda: repository.count_unprocessed(record.content_sha256))
+
+
+@worker_process_init.connect
+def _warm_up_processor(**kwargs):
+    """Connect each worker process to the model API before its first task, on the loop its tasks run on."""
+    from backend.core.processor import warm_up
+
     try:
-        # Convert dict to ProcessingOptions
-        options = ProcessingOptions(**options_dict)
-        
-        # Process document (this would be awaited in an async context)
-        # For Celery, we're using the sync version
-        result = process_document(content, options)
-        
-        return {
-            "id": result.id,
-            "summary": result.summary,
-            "analysis": result.analysis,
-            "status": "completed"
-        }
+        _run_async(warm_up())
     except Exception as e:
-        logger.error(f"Error processing document: {str(e)}")
-        self.update_state(state="FAILURE", meta={"error": str(e)})
-        raise
+        logger.warning(f"Could not warm up the document processor: {e}")
+
+
+@task_postrun.connect(sender=process_document_task)
+def _release_scheduled_job(args=None, **kwargs):
+    """Free the scheduler capacity held by the document once its task ends, whatever the outcome."""
+    if args:
+        release_job(args[0])
+
+
+def _share_with_followers(
+    repository: DocumentRepository, fingerprint: Optional[str], document_id: str, values: dict, event: DocumentEvent
+) -> None:
+    """
+    Copy the final status of a document to the submissions coalesced onto it, and notify them
+    """
+    if fingerprint is None:
+        return
+    followers = resolve_followers(fingerprint, document_id)
+    if not followers:
+        return
+    repository.update_many(followers, values)
+    data = {key: value for key, value in values.items() if key != "status"}
+    for follower_id in followers:
+        publish_event(follower_id, event, {**data, "coalesced_with": document_id})
+    logger.info(f"Shared result of document {document_id} with {len(followers)} coalesced submissions")
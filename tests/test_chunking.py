@@ -0,0 +1,39 @@
+import random
+from typing import Iterator
+
+import pytest
+
+from backend.core.chunking import chunk_document, chunk_stream
+
+WORDS = ["a", "bb", "ccc", "dddd.", "e!", "ff?", "# Title", "x" * 70, "   ", "end.\t\t"]
+
+
+def random_document(rng: random.Random) -> str:
+    paragraphs = []
+    for _ in range(rng.randint(1, 30)):
+        separator = rng.choice([" ", "  ", "\n", " \t"])
+        words = separator.join(rng.choice(WORDS) for _ in range(rng.randint(1, 60)))
+        paragraphs.append(rng.choice(["", " ", "\n"]) + words + rng.choice(["\n\n", "\n \n", "\n\n\n", " \n\n  "]))
+    return "".join(paragraphs)
+
+
+def iter_chunks(text: str, rng: random.Random) -> Iterator[str]:
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 20))))
+    for begin, end in zip([0] + cuts, cuts + [len(text)]):
+        yield text[begin:end]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_chunk_stream_matches_chunk_document(seed: int):
+    rng = random.Random(seed)
+    text = random_document(rng)
+    max_chars = rng.choice([20, 50, 120, 300])
+    overlap_chars = rng.choice([0, 30])
+
+    expected = chunk_document(text, max_chars, overlap_chars)
+    streamed = chunk_stream(iter_chunks(text, rng), max_chars, overlap_chars)
+
+    assert [(chunk.start, chunk.text) for chunk in streamed] == [(chunk.start, chunk.text) for chunk in expected]
+    for chunk in expected:
+        own_text = chunk.text[chunk.overlap :]
+        assert text.startswith(own_text.split("\n")[0], chunk.start)
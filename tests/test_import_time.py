@@ -0,0 +1,11 @@
+import pytest
+
+from backend.utils.import_time import ENTRY_POINTS, measure
+
+
+@pytest.mark.parametrize("module, budget_ms", ENTRY_POINTS.items())
+def test_entry_point_within_import_budget(module: str, budget_ms: float):
+    report = measure(module)
+    assert report.error is None, f"{module} failed to import: {report.error}"
+    assert not report.forbidden, f"{module} imports {', '.join(report.forbidden)}"
+    assert report.total_ms <= budget_ms, f"{module} imports in {report.total_ms:.0f} ms, budget {budget_ms:.0f} ms"
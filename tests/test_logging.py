@@ -0,0 +1,19 @@
+import importlib
+import logging
+
+import pytest
+
+from backend.settings import configure_logging
+
+
+@pytest.mark.parametrize(
+    "module, logger_name",
+    [
+        ("backend.main", "backend.api.middleware"),
+        ("backend.workers.tasks", "backend.workers.tasks"),
+    ],
+)
+def test_configure_logging_keeps_module_loggers_enabled(module: str, logger_name: str):
+    importlib.import_module(module)
+    configure_logging(force=True)
+    assert logging.getLogger(logger_name).disabled is False